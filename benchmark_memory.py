@@ -0,0 +1,153 @@
+''' Report how many bytes each retained game state costs.
+
+Run as a script, with an optional number of states to retain per game:
+
+    python benchmark_memory.py 20000
+
+For every kind of state, the states reachable from a starting position are
+collected breadth first and measured twice: as they are now, with
+__slots__ and a class-level instructions string, and laid out the way they
+used to be, as an object with a per-instance __dict__ holding the same
+attributes plus its own instructions. Both layouts share the same
+attribute values, so the difference is exactly the cost of the layout.
+Cached results (see GameState.clear_cache) are left out, since they are
+only built for states a search actually expands.
+'''
+import sys
+import tracemalloc
+from subtract_square_state import SubtractSquareState
+from tippy_game_state import TippyGameState
+from tippy_bitboard_state import TippyBitboardState
+
+
+class LegacyState:
+    ''' A stand-in for a game state with a per-instance __dict__, as
+    GameState was before it had __slots__.
+    '''
+
+
+def slot_names(cls):
+    ''' (type) -> list of str
+
+    Return the names of all slots of cls and its base classes.
+
+    >>> slot_names(SubtractSquareState)[-1]
+    'current_total'
+    '''
+
+    names = []
+    for c in reversed(cls.__mro__):
+        names.extend(c.__dict__.get('__slots__', ()))
+    return names
+
+
+def retained_states(start, count):
+    ''' (GameState, int) -> list of GameState
+
+    Return up to count distinct states reachable from start, breadth first,
+    with their caches cleared.
+    '''
+
+    seen, queue, i = {start.key(): start}, [start], 0
+    while i < len(queue) and len(queue) < count:
+        for (m, s) in queue[i].children():
+            if len(queue) < count and s.key() not in seen:
+                seen[s.key()] = s
+                queue.append(s)
+        i += 1
+    for s in queue:
+        s.clear_cache()
+    return queue
+
+
+def bytes_per_object(make, states):
+    ''' (function, list of GameState) -> float
+
+    Return the average number of bytes allocated by make(s) for each s in
+    states, not counting the list that holds the results.
+    '''
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    shells = [make(s) for s in states]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(shells)) / len(states)
+
+
+def slotted_copy(state):
+    ''' (GameState) -> GameState
+
+    Return a copy of state in its current, slotted layout that shares all
+    of its attribute values.
+    '''
+
+    new = object.__new__(type(state))
+    for name in slot_names(type(state)):
+        object.__setattr__(new, name, getattr(state, name))
+    return new
+
+
+def legacy_copy(state, cls=LegacyState):
+    ''' (GameState, type) -> LegacyState
+
+    Return a copy of state in the old, __dict__ layout, as an instance of
+    cls, that shares all of its attribute values and has an instructions
+    entry in its __dict__.
+    '''
+
+    new = cls()
+    for name in slot_names(type(state)):
+        setattr(new, name, getattr(state, name))
+    new.instructions = state.instructions
+    return new
+
+
+def payload_bytes(state):
+    ''' (GameState) -> int
+
+    Return the bytes used by the attribute values that belong to state
+    alone: ints other than the small cached ones, and lists (such as a
+    Tippy grid). Interned moves and shared strings are not counted.
+    '''
+
+    total = 0
+    for name in slot_names(type(state)):
+        value = getattr(state, name)
+        if isinstance(value, int) and not isinstance(value, bool) and \
+                not -5 <= value <= 256:
+            total += sys.getsizeof(value)
+        elif isinstance(value, list):
+            total += sys.getsizeof(value)
+            total += sum([sys.getsizeof(v) for v in value
+                          if isinstance(v, list)])
+    return total
+
+
+def report(name, start, count):
+    ''' (str, GameState, int) -> NoneType
+
+    Print the bytes per retained state for the states reachable from start,
+    in the old and the new layout.
+    '''
+
+    states = retained_states(start, count)
+    payload = sum([payload_bytes(s) for s in states]) / len(states)
+    # a class of its own, as each game had, so instances of different
+    # games do not spoil each other's key-sharing dicts
+    legacy = type('Legacy' + type(start).__name__, (LegacyState,), {})
+    before = bytes_per_object(lambda s: legacy_copy(s, legacy),
+                              states) + payload
+    after = bytes_per_object(slotted_copy, states) + payload
+    print('{:<22} {:>8} states  {:>7.1f} -> {:>7.1f} bytes/state '
+          '({:.0%} saved)'.format(name, len(states), before, after,
+                                  1 - after / before))
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    report('SubtractSquareState',
+           SubtractSquareState('p1', current_total=count), count)
+    report('TippyGameState 4x4',
+           TippyGameState('p1', False, [[' '] * 4 for i in range(4)]), count)
+    report('TippyBitboardState 4x4', TippyBitboardState('p1', size=4), count)
@@ -0,0 +1,72 @@
+''' Report how many states each search strategy expands on the same
+positions, and how long it takes.
+
+Run as a script, with an optional number of moves to play at random before
+each 4x4 position is searched:
+
+    python benchmark_search.py 6
+
+StrategyMinimaxPrune searches to the end of the game, while
+StrategyMinimaxMyopic and StrategyMinimaxMTDF search 5 levels below each
+move, 6 from the position, and find the same myopic score, so only the
+last two are comparable. Ties between moves may still be broken
+differently. For MTD(f), the states searched by each of its passes are
+listed too.
+'''
+import sys
+import random
+import time
+from tippy_bitboard_state import TippyBitboardState
+from strategy_minimax_prune import StrategyMinimaxPrune
+from strategy_minimax_myopic import StrategyMinimaxMyopic
+from strategy_minimax_mtdf import StrategyMinimaxMTDF
+
+
+def positions(moves, count=3, seed=148):
+    ''' (int, int, int) -> list of GameState
+
+    Return the empty 3x3 Tippy board and count 4x4 Tippy boards, each
+    reached by playing moves random moves, the same ones every run.
+
+    >>> len(positions(4))
+    4
+    '''
+
+    rand = random.Random(seed)
+    states = [TippyBitboardState('p1')]
+    while len(states) < count + 1:
+        state = TippyBitboardState('p1', size=4)
+        for i in range(moves):
+            state = state.apply_move(rand.choice(state.possible_next_moves()))
+        if not state.over:
+            states.append(state)
+    return states
+
+
+def report(name, strategy, state):
+    ''' (str, Strategy, GameState) -> NoneType
+
+    Print the move strategy suggests for state, the states it searched
+    and the seconds it took.
+    '''
+
+    start = time.perf_counter()
+    move = strategy.suggest_move(state)
+    seconds = time.perf_counter() - start
+    passes = ''
+    if isinstance(strategy, StrategyMinimaxMTDF):
+        passes = '  passes: {}'.format(strategy.pass_nodes)
+    print('  {:<8} {:<22} {:>9} states {:>8.3f} s{}'.format(
+        name, str(move), strategy.nodes, seconds, passes))
+
+
+if __name__ == '__main__':
+    moves = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    for state in positions(moves):
+        print('{}x{} Tippy, {} to play, {} moves made:'.format(
+            state.size, state.size, state.next_player,
+            bin(state.x | state.o).count('1')))
+        if state.size == 3:
+            report('prune', StrategyMinimaxPrune(in_place=True), state)
+        report('myopic', StrategyMinimaxMyopic(in_place=True), state)
+        report('mtdf', StrategyMinimaxMTDF(in_place=True), state)
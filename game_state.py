@@ -9,13 +9,30 @@ class GameState:
                            in which case it is the opponent of the player
                            who just moved
     over: bool          -- flag indicating whether game is over
-    instructions: str   -- description of what actions to take at each turn
+    instructions: str   -- class constant describing what actions to take
+                           at each turn
+    undo: list          -- stack of what pop needs to take back the moves
+                           pushed onto self, or None if nothing was pushed
+
+    Subclasses may cache the results of winner, possible_next_moves and
+    rough_outcome in _winners, _moves and _rough, which start out None and
+    are reset by clear_cache whenever self changes in place.
     WIN: float          -- class constant indicating next player has won
     LOSE: float         -- class constant indicating next player has lost
     DRAW: float         -- class constant indicating next player tied
+    KEY_VERSION: int    -- class constant to be increased whenever what key
+                           returns changes, so that saved scores of states
+                           are not looked up by the old keys
     '''
+    # states are created by the million during searches, so give them
+    # fixed slots instead of a __dict__ each
+    __slots__ = ('next_player', 'over', 'undo',
+                 '_winners', '_moves', '_rough')
+
     # assign class constants
     WIN, LOSE, DRAW = 1.0, -1.0, 0.0
+    KEY_VERSION = 1
+    instructions = 'Generic instructions --- fill in with subclass'
 
     def __init__(self, p, interactive=False):
         '''(GameState, str, bool) -> NoneType
@@ -26,7 +43,8 @@ class GameState:
         prerequisite - p is in {'p1', 'p2'}
         '''
         self.next_player, self.over = p, False
-        self.instructions = 'Generic instructions --- fill in with subclass'
+        self.undo = None
+        self._winners = self._moves = self._rough = None
 
     def opponent(self):
         '''(GameState) -> str
@@ -49,11 +67,52 @@ class GameState:
         '''
         raise NotImplementedError('Implemented in a subclass')
 
-    def apply_move(self, move):
-        '''(GameState, Move) -> GameState
+    def apply_move(self, move, trusted=False):
+        '''(GameState, Move, bool) -> GameState
 
         Return the new game state reached by applying move to
-        state self, or None if the move is illegal.
+        state self, or None if the move is illegal. If trusted, move
+        is known to be legal (it came from possible_next_moves) and
+        is applied without checking.
+        '''
+        raise NotImplementedError('Method must be implemented in a subclass')
+
+    def children(self):
+        '''(GameState) -> list of (Move, GameState)
+
+        Return a list pairing each legal move from self with the game
+        state it leads to.
+        '''
+        return [(m, self.apply_move(m, True))
+                for m in self.possible_next_moves()]
+
+    def clear_cache(self):
+        '''(GameState) -> NoneType
+
+        Forget the cached results of winner, possible_next_moves and
+        rough_outcome, because self has changed.
+        '''
+        self._winners = self._moves = self._rough = None
+
+    def push(self, move):
+        '''(GameState, Move) -> NoneType
+
+        Apply legal move to self in place, recording what is needed to
+        take it back on the undo stack. Unlike apply_move, no new GameState
+        is created, which makes push and pop the cheaper way to walk a
+        search tree.
+
+        Assume: move is in self.possible_next_moves()
+        '''
+        raise NotImplementedError('Method must be implemented in a subclass')
+
+    def pop(self):
+        '''(GameState) -> Move
+
+        Take back the move most recently pushed onto self, restoring self to
+        the state it was in before that push, and return the move.
+
+        Assume: a move has been pushed onto self and not yet popped
         '''
         raise NotImplementedError('Method must be implemented in a subclass')
 
@@ -71,7 +130,8 @@ class GameState:
         ''' (GameState) -> list of Move
 
         Return a (possibly empty) list of moves that are legal
-        from the present state.
+        from the present state. The list may be cached and shared between
+        callers, so it must not be modified.
         '''
         raise NotImplementedError('Method must be implemented in a subclass')
 
@@ -90,6 +150,32 @@ class GameState:
         else:
             return GameState.DRAW
 
+    def key(self):
+        ''' (GameState) -> hashable
+
+        Return a compact hashable key for self. Equivalent states of the
+        same game always have equal keys, and states of the same game that
+        are not equivalent, even on boards of different sizes, should have
+        different keys. Keys that pack the whole state, like those of
+        SubtractSquareState and TippyBitboardState, never collide; hashed
+        keys, like the Zobrist hash of TippyGameState, collide with a
+        chance of about 2 ** -64 per pair of states. Search strategies use
+        it to index their caches, which trust it.
+
+        Subclasses should override this with something cheaper than the
+        default, which is repr(self).
+        '''
+        return repr(self)
+
+    def solved_outcome(self):
+        '''(GameState) -> float
+
+        Return the outcome next_player gets from self with perfect play by
+        both players, if the game knows it without searching, or None. The
+        outcome is in {WIN, LOSE, DRAW}.
+        '''
+        return None
+
     def rough_outcome(self):
         '''(GameState) -> float
 
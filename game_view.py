@@ -1,15 +1,26 @@
+import asyncio
+import time
+from ponder import Ponderer
+
+
 class GameView:
     '''
     A game view for a two-player, sequential move, zero-sum,
     perfect-information game.
+
+    time_limit: float  -- seconds the computer may think about a move, or
+                          None for as long as its strategy takes
+    ponderer: Ponderer -- searches replies while the human thinks, or None
     '''
 
-    def __init__(self, state, strategy):
+    def __init__(self, state, strategy, time_limit=None, ponder=False):
         '''(GameView, GameState.__class__,
-            Strategy.__class__) -> NoneType
+            Strategy.__class__, float, bool) -> NoneType
 
         Create GameView self for game described by state, where
-        computer uses given strategy.
+        computer uses given strategy, taking at most time_limit seconds
+        a move if it is given. If ponder, the computer searches its
+        replies while the human thinks about their move.
         '''
         player = input('Type c if you wish the computer to play first: ')
         if player == 'c':
@@ -18,6 +29,8 @@ class GameView:
             p = 'p1'
         self.state = state(p, interactive=True)
         self.strategy = strategy(interactive=True)
+        self.time_limit = time_limit
+        self.ponderer = Ponderer(self.strategy) if ponder else None
 
     def play(self):
         ''' (GameView) -> NoneType
@@ -29,6 +42,8 @@ class GameView:
         print()
         while not self.state.over:
             if self.state.next_player == 'p1':
+                if self.ponderer is not None:
+                    self.ponderer.start(self.state)
                 m = self.state.get_move()
                 while not m in self.state.possible_next_moves():
                     # The move was illegal.
@@ -39,11 +54,25 @@ class GameView:
                 print('You choose: {}'.format(m))
             else:
                 # The computer makes a move.
-                m = self.strategy.suggest_move(self.state)
+                m, deadline = None, None
+                if self.time_limit is not None:
+                    deadline = time.monotonic() + self.time_limit
+                if self.ponderer is not None:
+                    # the reply may have been found while the human thought
+                    m = self.ponderer.move(self.state, deadline)
+                if m is None and deadline is None:
+                    m = self.strategy.suggest_move(self.state)
+                elif m is None:
+                    # take the best move so far once time is up
+                    m = asyncio.run(self.strategy.suggest_move_async(
+                        self.state, deadline))
                 print('The computer chooses: {}'.format(m))
             self.state = self.state.apply_move(m)
             print('New game state: \n' + str(self.state))
             print()
+        if self.ponderer is not None:
+            # a search left running past a time limit need not be waited for
+            self.ponderer.stop(self.time_limit is None)
 
         if self.state.winner('p2'):
             # p2, the computer, wins
@@ -58,21 +87,47 @@ class GameView:
 if __name__ == '__main__':
     from subtract_square_state import SubtractSquareState
     from tippy_game_state import TippyGameState, find_tippy
-    game_state = {'s': SubtractSquareState, 't': TippyGameState}
+    from tippy_bitboard_state import TippyBitboardState
+    game_state = {'s': SubtractSquareState, 't': TippyGameState,
+                  'b': TippyBitboardState}
     from strategy_random import StrategyRandom
     from strategy_minimax import StrategyMinimax
     from strategy_minimax_memoize import StrategyMinimaxMemoize
     from strategy_minimax_prune import StrategyMinimaxPrune
     from strategy_minimax_myopic import StrategyMinimaxMyopic
+    from strategy_minimax_prune_memoize import StrategyMinimaxPruneMemoize
+    from strategy_minimax_deepening import StrategyMinimaxDeepening
+    from strategy_minimax_pvs import StrategyMinimaxPVS
+    from strategy_minimax_mtdf import StrategyMinimaxMTDF
+    from strategy_proof_number import StrategyProofNumber
+    from strategy_mcts import StrategyMCTS
+    from strategy_tablebase import StrategyTablebase
+    from strategy_minimax_persistent import StrategyMinimaxPersistent
     strategy = {'r': StrategyRandom, 'm': StrategyMinimax, 
                 'n': StrategyMinimaxMemoize, 'p': StrategyMinimaxPrune,
-                'o': StrategyMinimaxMyopic}
+                'o': StrategyMinimaxMyopic, 'a': StrategyMinimaxPruneMemoize,
+                'd': StrategyMinimaxDeepening, 'v': StrategyMinimaxPVS,
+                'f': StrategyMinimaxMTDF, 'x': StrategyProofNumber,
+                'u': StrategyMCTS, 'e': StrategyTablebase,
+                'c': StrategyMinimaxPersistent}
     g = ''
     while not g in game_state.keys():
-        g = input('Enter s to play Subtract Square, t to play Tippy: ')
+        g = input('Enter s to play Subtract Square, t to play Tippy, '
+                  + 'or b to play Tippy on a bitboard: ')
     s = ''
     while not s in strategy.keys():
+        # minimax prune memoize is the fastest, so it is the default
         s = input('Enter r for random strategy for computer, m for minimax, '
                   + 'n for minimax memoize, p for minimax prune, '
-                  + 'or o for minimax myopic: ')
-    GameView(game_state[g], strategy[s]).play()
\ No newline at end of file
+                  + 'c for minimax memoize saving its scores to disk, '
+                  + 'o for minimax myopic, d for minimax deepening, '
+                  + 'v for principal variation search, f for MTD(f), '
+                  + 'x for proof-number search, '
+                  + 'u for Monte Carlo tree search, '
+                  + 'e for a tablebase solved by retrograde analysis, '
+                  + 'or a (or nothing) for minimax prune memoize: ') or 'a'
+    t = input('Enter the most seconds the computer may think about a move '
+              + '(or nothing for no limit): ')
+    ponder = input('Type y if the computer may think while you do: ')
+    GameView(game_state[g], strategy[s], float(t) if t else None,
+             ponder == 'y').play()
\ No newline at end of file
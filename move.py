@@ -4,4 +4,6 @@ class Move:
     zero-sum, perfect-information game.
     '''
 
-    # There is nothing to define here!
+    # There is nothing else to define here! The empty __slots__ lets
+    # subclasses leave out the per-instance __dict__.
+    __slots__ = ()
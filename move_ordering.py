@@ -0,0 +1,104 @@
+class MoveOrdering:
+    ''' Decides the order in which a pruning search tries the moves of a
+    GameState, learning from the moves that caused cutoffs before.
+
+    The earlier a search finds a move good enough to cut off the rest, the
+    fewer states it expands, so each state's moves are tried in order:
+    killer moves first (the latest moves to cause a cutoff at the same
+    ply, which are often just as good in neighbouring positions), then the
+    other moves by how many cutoffs each has caused anywhere (the history
+    table). If rough is set, the remaining moves are first ordered by the
+    rough_outcome of the state each reaches, which is more informed but
+    costs a new state per move.
+
+    killers: list   -- killers[ply] lists up to KILLERS killer moves for
+                       ply, the latest first, if killers are used, or None
+    history: dict   -- cutoffs caused by each Move, each weighing
+                       2 ** -ply so that those high in the tree count
+                       most, if the history table is used, or None
+    rough: bool     -- whether to order by rough_outcome
+    KILLERS: int    -- class constant: how many killer moves to keep for
+                       each ply
+    '''
+
+    KILLERS = 2
+
+    def __init__(self, killers=True, history=False, rough=False):
+        ''' (MoveOrdering, bool, bool, bool) -> NoneType
+
+        Create a MoveOrdering using killer moves, a history table and
+        rough_outcome as chosen. Killer moves alone search the fewest
+        states in Tippy, so they are the default.
+        '''
+
+        self.killers = [] if killers else None
+        self.history = {} if history else None
+        self.rough = rough
+
+    def clear(self):
+        ''' (MoveOrdering) -> NoneType
+
+        Forget every killer move and the history table.
+        '''
+
+        if self.killers is not None:
+            self.killers = []
+        if self.history is not None:
+            self.history = {}
+
+    def order(self, state, moves, ply):
+        ''' (MoveOrdering, GameState, list of Move, int) -> list of Move
+
+        Return moves, the possible_next_moves of state, ply levels below
+        the state a search started from, in the order to try them.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> from subtract_square_move import SubtractSquareMove
+        >>> o = MoveOrdering(history=True)
+        >>> s = SubtractSquareState('p1', current_total=10)
+        >>> o.cutoff(s, SubtractSquareMove(1), 3)
+        >>> o.cutoff(s, SubtractSquareMove(4), 2)
+        >>> o.order(s, s.possible_next_moves(), 3)
+        [SubtractSquareMove(1), SubtractSquareMove(4), SubtractSquareMove(9)]
+        >>> o.order(s, s.possible_next_moves(), 1)
+        [SubtractSquareMove(4), SubtractSquareMove(1), SubtractSquareMove(9)]
+        '''
+
+        if self.rough:
+            # the rough_outcome of each new state is for the opponent, so
+            # the lower it is, the better the move
+            rough = {}
+            for i in moves:
+                rough[i] = state.apply_move(i, True).rough_outcome()
+            moves = sorted(moves, key=rough.__getitem__)
+        if self.history:
+            history = self.history
+            moves = sorted(moves, key=lambda i: -history.get(i, 0))
+        if self.killers is not None and ply < len(self.killers):
+            killers = [i for i in self.killers[ply] if i in moves]
+            if killers:
+                moves = killers + [i for i in moves if i not in killers]
+        return moves
+
+    def cutoff(self, state, move, ply):
+        ''' (MoveOrdering, GameState, Move, int) -> NoneType
+
+        Record that move caused a cutoff at state, ply levels below the
+        state a search started from.
+        '''
+
+        if self.killers is not None:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            killers = self.killers[ply]
+            if move in killers:
+                killers.remove(move)
+            killers.insert(0, move)
+            del killers[MoveOrdering.KILLERS:]
+        if self.history is not None:
+            self.history[move] = self.history.get(move, 0) + 2.0 ** -ply
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
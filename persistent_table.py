@@ -0,0 +1,210 @@
+import os
+import sqlite3
+from transposition_table import TranspositionTable
+
+
+def key_bytes(key):
+    ''' (hashable) -> bytes
+
+    Return key as bytes, the same in every process: an int, as every
+    GameState.key in this package returns, in as few bytes as it takes,
+    and any other key through its repr.
+
+    >>> key_bytes(34), key_bytes('a')
+    (b'i"', b"r'a'")
+    '''
+
+    if isinstance(key, int):
+        return b'i' + key.to_bytes(key.bit_length() // 8 + 1, 'little',
+                                   signed=True)
+    return b'r' + repr(key).encode()
+
+
+class PersistentTable(TranspositionTable):
+    ''' A TranspositionTable whose entries are also kept in a sqlite
+    database file, so that scores found by one process are there for the
+    next one, even after a restart.
+
+    The database is only opened, and the entries of game loaded into
+    memory, at the first lookup. Once they do not all fit, a key missing
+    from memory is looked up in the database. While they do, a key missing
+    from memory is not looked for in the database at all, so entries that
+    other processes write after the load are only seen by a table opened
+    after them. New entries are written in batches of batch entries, and
+    by flush. The database is in write-ahead log mode, so any number of
+    processes can read it while one writes, and each process opens its own
+    connection.
+
+    Entries are stored under game and version, and only those of the same
+    version are looked up, so changing version leaves behind scores that
+    no longer apply, for example after GameState.key changes. Entries of
+    older versions of game are deleted when the database is opened; a
+    process still using an older version may go on writing them, but they
+    are never read by a newer one. clear only empties the table in memory.
+
+    path: str     -- the database file
+    game: str     -- name the entries are stored under
+    version: int  -- version of the entries of game
+    batch: int    -- entries stored before they are written together
+    reads: int    -- entries read from the database one by one
+    writes: int   -- entries written to the database
+    '''
+
+    def __init__(self, path, game, version=1, max_entries=2**18,
+                 max_bytes=None, policy='depth', batch=4096):
+        ''' (PersistentTable, str, str, int, int, int, str, int) -> NoneType
+
+        Create a PersistentTable for the entries of game in the database
+        at path, holding at most max_entries entries, or about max_bytes,
+        in memory.
+        '''
+
+        TranspositionTable.__init__(self, max_entries, max_bytes, policy)
+        self.path, self.game, self.version = path, game, version
+        self.batch, self.pending = batch, []
+        self.connection, self.pid = None, None
+        self.loaded = self.complete = False
+        self.reads = self.writes = 0
+
+    def connect(self):
+        ''' (PersistentTable) -> sqlite3.Connection
+
+        Return the connection of this process to the database, opening it
+        and deleting the entries of older versions of game first if need
+        be.
+        '''
+
+        if self.connection is not None and self.pid == os.getpid():
+            return self.connection
+        # a connection must not be used by a process it was not opened in
+        connection = sqlite3.connect(self.path, timeout=60,
+                                     check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS entries '
+                               '(game TEXT, version INTEGER, key BLOB, '
+                               'score REAL, depth INTEGER, '
+                               'PRIMARY KEY (game, version, key)) '
+                               'WITHOUT ROWID')
+            connection.execute('DELETE FROM entries '
+                               'WHERE game = ? AND version < ?',
+                               (self.game, self.version))
+        self.connection, self.pid = connection, os.getpid()
+        return connection
+
+    def load(self):
+        ''' (PersistentTable) -> NoneType
+
+        Load the entries of game into memory, if they fit.
+        '''
+
+        connection, self.loaded = self.connect(), True
+        count = connection.execute(
+            'SELECT COUNT(*) FROM entries WHERE game = ? AND version = ?',
+            (self.game, self.version)).fetchone()
+        if count[0] > self.max_entries:
+            return
+        skipped = 0
+        for (key, score, depth) in connection.execute(
+                'SELECT key, score, depth FROM entries '
+                'WHERE game = ? AND version = ?', (self.game, self.version)):
+            if key[:1] == b'i':
+                key = int.from_bytes(key[1:], 'little', signed=True)
+                TranspositionTable.store(self, key, score, depth)
+            else:
+                # only an int is turned back from its bytes, so other
+                # keys are left to be looked up one by one
+                skipped += 1
+        self.stores -= count[0] - skipped
+        self.complete = skipped == 0
+
+    def probe(self, key):
+        ''' (PersistentTable, hashable) -> tuple
+
+        Return the (value, depth) stored for key, or None if there is none.
+        Override TranspositionTable.probe
+
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'scores')
+        >>> t = PersistentTable(path, 'game')
+        >>> t.store(7, 1.0, 3)
+        >>> t.close()
+        >>> PersistentTable(path, 'game').probe(7)
+        (1.0, 3)
+        >>> PersistentTable(path, 'game', 2).probe(7) is None
+        True
+        >>> PersistentTable(path, 'game').probe(7) is None
+        True
+        '''
+
+        if not self.loaded:
+            self.load()
+        entry = TranspositionTable.probe(self, key)
+        # while every entry is in memory, a key missing there is not stored
+        if entry is None and (not self.complete or self.evictions):
+            row = self.connect().execute(
+                'SELECT score, depth FROM entries '
+                'WHERE game = ? AND version = ? AND key = ?',
+                (self.game, self.version, key_bytes(key))).fetchone()
+            if row is not None:
+                self.reads += 1
+                TranspositionTable.store(self, key, row[0], row[1])
+                entry = row
+        return entry
+
+    def store(self, key, value, depth=0):
+        ''' (PersistentTable, hashable, float, int) -> NoneType
+
+        Store value for key, in memory at once and in the database with
+        the next batch.
+        Override TranspositionTable.store
+        '''
+
+        TranspositionTable.store(self, key, value, depth)
+        self.pending.append((self.game, self.version, key_bytes(key), value,
+                             depth))
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        ''' (PersistentTable) -> NoneType
+
+        Write the entries stored since the last batch to the database.
+        '''
+
+        if self.pending:
+            with self.connect() as connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)',
+                    self.pending)
+            self.writes += len(self.pending)
+            self.pending = []
+
+    def close(self):
+        ''' (PersistentTable) -> NoneType
+
+        Write any entries not written yet, and close the connection of
+        this process to the database.
+        '''
+
+        self.flush()
+        if self.connection is not None and self.pid == os.getpid():
+            self.connection.close()
+        self.connection = None
+
+    def stats(self):
+        ''' (PersistentTable) -> dict
+
+        Return the size of self and its counters.
+        Override TranspositionTable.stats
+        '''
+
+        stats = TranspositionTable.stats(self)
+        stats.update({'reads': self.reads, 'writes': self.writes})
+        return stats
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,172 @@
+import threading
+import time
+
+
+class Ponderer:
+    ''' Searches on the opponent's time: while a human thinks about their
+    move, a background thread asks a strategy for its reply to each of
+    the human's moves, most likely first, and keeps the replies. When the
+    human's move comes, the reply to it is used if it is ready, and
+    otherwise the pondering stops, so the strategy can search as usual.
+    Either way, whatever the searches stored in the strategy's tables,
+    such as those of StrategyMinimaxMemoize, makes that search faster.
+
+    A strategy runs one search at a time. StrategyMinimaxDeepening and
+    StrategyMCTS stop when asked; other strategies finish the search
+    first, so without a deadline stopping waits for them, and with one a
+    later search waits for the strategy's lock.
+
+    strategy: Strategy  -- the strategy that searches
+    replies: int        -- most of the human's moves to search replies to,
+                           or None for all of them
+    moves: dict         -- the strategy's reply to each state searched so
+                           far, by GameState.key, in this round of
+                           pondering; it is also the token of its searches
+    stopping: Event     -- set once this round of pondering is to stop
+    hits: int           -- moves answered with a reply ready or in progress
+    misses: int         -- moves that had to be searched as usual
+    '''
+
+    def __init__(self, strategy, replies=None):
+        ''' (Ponderer, Strategy, int) -> NoneType
+
+        Create a Ponderer for strategy that searches replies to at most
+        replies of the human's moves.
+        '''
+
+        self.strategy, self.replies = strategy, replies
+        self.thread, self.current, self.fallback = None, None, None
+        self.stopping = threading.Event()
+        self.moves, self.hits, self.misses = {}, 0, 0
+
+    def start(self, state):
+        ''' (Ponderer, GameState) -> NoneType
+
+        Stop any pondering, without waiting for it, and start searching
+        for replies to the moves of the human, who moves next from state.
+        '''
+
+        self.stop(False)
+        self.moves, self.current, self.fallback = {}, None, None
+        self.stopping = threading.Event()
+        if state.over:
+            return
+        self.thread = threading.Thread(
+            target=self.ponder, args=(state, self.moves, self.stopping),
+            daemon=True)
+        self.thread.start()
+
+    def ponder(self, state, moves, stopping):
+        ''' (Ponderer, GameState, dict, Event) -> NoneType
+
+        Search the strategy's reply to each of the human's moves from
+        state in turn, storing them in moves, until stopping is set. This
+        is what the background thread runs.
+        '''
+
+        # the human is most likely to leave the strategy a state that
+        # looks bad for it; sorted here, since rough_outcome may take a
+        # while
+        children = [state.apply_move(i, True)
+                    for i in state.possible_next_moves()]
+        children.sort(key=lambda child: child.rough_outcome())
+        for child in children[:self.replies]:
+            if child.over or stopping.is_set():
+                continue
+            # ready in case the search of child runs out of time
+            fallback = self.strategy.rough_move(child)
+            with self.strategy.lock:
+                # before looking at stopping, so that a stop from now on
+                # reaches the search
+                self.strategy.begin_search(moves)
+                try:
+                    if stopping.is_set():
+                        return
+                    key = child.key()
+                    if moves is self.moves:
+                        self.fallback, self.current = fallback, key
+                    move = self.strategy.suggest_move(child)
+                finally:
+                    stopped = self.strategy.end_search()
+                if not stopped:
+                    # a search that was stopped may not have found the best
+                    moves[key] = move
+                if moves is self.moves:
+                    self.current = None
+
+    def move(self, state, deadline=None):
+        ''' (Ponderer, GameState, float) -> Move
+
+        Return the strategy's reply to state if pondering found it, or
+        None, and stop pondering. A reply already found is returned at
+        once. A reply still being searched is waited for, until
+        time.monotonic() passes deadline if it is given; then that search
+        is stopped, and the best move it found so far is returned, or the
+        move the strategy's rough_move gave before the search began.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> from strategy_minimax_memoize import StrategyMinimaxMemoize
+        >>> p = Ponderer(StrategyMinimaxMemoize())
+        >>> p.start(SubtractSquareState('p1', current_total=25))
+        >>> p.thread.join()  # as if the human took their time
+        >>> print(p.move(SubtractSquareState('p2', current_total=21)))
+        Remove 16
+        '''
+
+        key = state.key()
+        if key in self.moves:
+            # the search in progress, if any, is of some other state
+            self.stop(False)
+        elif key == self.current:
+            # let the search of state finish, but start no other
+            fallback = self.fallback
+            self.stopping.set()
+            if deadline is None:
+                self.join()
+            else:
+                self.join(max(deadline - time.monotonic(), 0))
+            if key not in self.moves:
+                # time is up while state is still being searched
+                self.strategy.stop(self.moves)
+                self.hits += 1
+                moves = state.possible_next_moves()
+                for move in (self.strategy.best_move(), fallback):
+                    if move in moves:
+                        return move
+                return moves[0]
+        else:
+            # only a search with no deadline needs the strategy to itself
+            self.stop(deadline is None)
+        move = self.moves.get(key)
+        if move is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return move
+
+    def stop(self, wait=True):
+        ''' (Ponderer, bool) -> NoneType
+
+        Stop pondering, and if wait, wait for the search in progress, if
+        any, to stop.
+        '''
+
+        self.stopping.set()
+        if self.thread is not None:
+            self.strategy.stop(self.moves)
+        if wait:
+            self.join()
+        else:
+            self.thread = None
+
+    def join(self, timeout=None):
+        ''' (Ponderer, float) -> NoneType
+
+        Wait for the background thread, if any, to finish, for at most
+        timeout seconds if it is given.
+        '''
+
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if not self.thread.is_alive():
+                self.thread = None
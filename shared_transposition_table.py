@@ -0,0 +1,251 @@
+import hashlib
+from multiprocessing import shared_memory
+
+# every 64-bit hash is folded from the key with this odd constant, so that
+# keys that differ only in their high bits still land in different buckets
+MASK = (1 << 64) - 1
+MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def key_hash(key):
+    ''' (hashable) -> int
+
+    Return a 64-bit hash of key that is the same in every process. An int
+    key, as every GameState.key in this package returns, is folded into
+    64 bits; any other key is hashed through its repr, since the built-in
+    hash of a str differs from one process to the next.
+
+    >>> key_hash(34) == key_hash(34), key_hash(34) == key_hash(35)
+    (True, False)
+    >>> 0 <= key_hash(2 ** 100) < 2 ** 64
+    True
+    '''
+
+    if isinstance(key, int):
+        h = 0
+        key &= (1 << key.bit_length() + 1) - 1  # make negative keys finite
+        while True:
+            h = ((h ^ (key & MASK)) * MULTIPLIER) & MASK
+            key >>= 64
+            if not key:
+                return h
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class SharedTranspositionTable:
+    ''' A fixed-size cache of search results for game states, keyed by
+    GameState.key(), that lives in shared memory so that every process
+    on the host can read and write it.
+
+    It is used like a TranspositionTable, and like its 'depth' policy the
+    table is an array of two-entry buckets: the first entry keeps the
+    result with the greatest depth, the second takes the newest. Each
+    entry is three 64-bit words: a check word, the value as a float, and
+    a word packing a bound flag, the depth and an occupied bit. No locks
+    are taken: the check word is the 64-bit hash of the key XOR the other
+    two words, so an entry half written by another process, or written
+    for another key, simply fails the check and reads as missing.
+
+    Values must be floats, and flags ints in [-128, 127], such as the
+    EXACT, LOWER and UPPER of strategy_minimax_prune_memoize. A table is
+    passed to another process by pickling it, which attaches to the same
+    memory. The entries are shared, but hits, misses and stores count
+    only what this process did, so a parent whose workers do the
+    searching sees them all at 0.
+
+    max_entries: int  -- most entries the table will hold
+    name: str         -- name of the shared memory block
+    hits: int         -- lookups in this process that found their key
+    misses: int       -- lookups in this process that did not
+    stores: int       -- results stored by this process
+    '''
+
+    OCCUPIED = 1 << 63
+
+    def __init__(self, max_entries=2 ** 18, name=None):
+        ''' (SharedTranspositionTable, int, str) -> NoneType
+
+        Create an empty SharedTranspositionTable holding at most
+        max_entries entries in a new block of shared memory, or, if name
+        is given, attach to the table of that many entries in the block
+        called name.
+        '''
+
+        self.buckets = max(max_entries // 2, 1)
+        self.max_entries = 2 * self.buckets
+        if name is None:
+            self.memory = shared_memory.SharedMemory(
+                create=True, size=self.max_entries * 3 * 8)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name, self.owner = self.memory.name, name is None
+        # the same memory seen as words and as floats
+        self.words = self.memory.buf.cast('Q')
+        self.floats = self.memory.buf.cast('d')
+        self.hits = self.misses = self.stores = 0
+
+    def __reduce__(self):
+        ''' (SharedTranspositionTable) -> tuple
+
+        Return how to rebuild self in another process: by attaching to
+        the same shared memory.
+        '''
+
+        return (SharedTranspositionTable, (self.max_entries, self.name))
+
+    def __len__(self):
+        ''' (SharedTranspositionTable) -> int
+
+        Return the number of entries in self, counting every one.
+
+        >>> t = SharedTranspositionTable(4)
+        >>> t.store(7, 1.0)
+        >>> len(t)
+        1
+        >>> t.unlink()
+        '''
+
+        return sum([1 for i in range(2, len(self.words), 3)
+                    if self.words[i] & SharedTranspositionTable.OCCUPIED])
+
+    def clear(self):
+        ''' (SharedTranspositionTable) -> NoneType
+
+        Remove every entry from self, for every process, and reset the
+        counters of this process.
+        '''
+
+        self.memory.buf[:] = bytes(self.memory.size)
+        self.hits = self.misses = self.stores = 0
+
+    def probe(self, key):
+        ''' (SharedTranspositionTable, hashable) -> tuple
+
+        Return the (value, depth, flag) stored for key, or None if there
+        is none.
+
+        >>> t = SharedTranspositionTable(4)
+        >>> t.store(7, 0.5, 3, -1)
+        >>> t.probe(7), t.probe(8)
+        ((0.5, 3, -1), None)
+        >>> t.unlink()
+        '''
+
+        h = key_hash(key)
+        words = self.words
+        i = (h % self.buckets) * 6
+        for j in (i, i + 3):
+            meta = words[j + 2]
+            if meta & SharedTranspositionTable.OCCUPIED and \
+                    words[j] ^ words[j + 1] ^ meta == h:
+                value = self.floats[j + 1]
+                if words[j] ^ words[j + 1] ^ words[j + 2] != h:
+                    # overwritten while it was being read
+                    break
+                self.hits += 1
+                flag = (meta >> 32) & 0xff
+                return (value, meta & 0xffffffff,
+                        flag - 256 if flag > 127 else flag)
+        self.misses += 1
+        return None
+
+    def get(self, key):
+        ''' (SharedTranspositionTable, hashable) -> float
+
+        Return the value stored for key, or None if there is none.
+
+        >>> t = SharedTranspositionTable(4)
+        >>> t.store('a', 1.0)
+        >>> t.get('a'), t.get('b')
+        (1.0, None)
+        >>> t.unlink()
+        '''
+
+        entry = self.probe(key)
+        return None if entry is None else entry[0]
+
+    def store(self, key, value, depth=0, flag=0):
+        ''' (SharedTranspositionTable, hashable, float, int, int) -> NoneType
+
+        Store value for key, with the given flag. depth measures how
+        expensive value was to compute, and decides which entries are
+        kept.
+
+        >>> t = SharedTranspositionTable(2)
+        >>> t.store('deep', 1.0, 100)
+        >>> t.store('shallow', 0.0, 1)
+        >>> t.store('newest', -1.0, 1)
+        >>> t.get('deep'), t.get('shallow'), t.get('newest')
+        (1.0, None, -1.0)
+        >>> t.unlink()
+        '''
+
+        self.stores += 1
+        h = key_hash(key)
+        words = self.words
+        i = (h % self.buckets) * 6
+        depth = min(max(depth, 0), 0xffffffff)
+        meta = (SharedTranspositionTable.OCCUPIED | (flag & 0xff) << 32 |
+                depth)
+        first = words[i + 2]
+        if not first & SharedTranspositionTable.OCCUPIED or \
+                words[i] ^ words[i + 1] ^ first == h:
+            j = i
+        elif depth >= first & 0xffffffff:
+            # keep the old entry in the always-replace slot; its check word
+            # does not depend on where it is
+            words[i + 4] = words[i + 1]
+            words[i + 5] = first
+            words[i + 3] = words[i]
+            j = i
+        else:
+            j = i + 3
+        self.floats[j + 1] = value
+        words[j + 2] = meta
+        words[j] = h ^ words[j + 1] ^ meta
+
+    def stats(self):
+        ''' (SharedTranspositionTable) -> dict
+
+        Return the size of self, which counts the entries of every
+        process, and the counters of this process only.
+        '''
+
+        return {'entries': len(self), 'hits': self.hits,
+                'misses': self.misses, 'stores': self.stores}
+
+    def __del__(self):
+        ''' (SharedTranspositionTable) -> NoneType
+
+        Let go of the views of the shared memory of self, so that it can
+        be closed.
+        '''
+
+        self.words.release()
+        self.floats.release()
+
+    def close(self):
+        ''' (SharedTranspositionTable) -> NoneType
+
+        Detach this process from the shared memory of self.
+        '''
+
+        self.words.release()
+        self.floats.release()
+        self.memory.close()
+
+    def unlink(self):
+        ''' (SharedTranspositionTable) -> NoneType
+
+        Detach from and free the shared memory of self, once every process
+        is done with it.
+        '''
+
+        self.close()
+        self.memory.unlink()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,15 +1,39 @@
+import asyncio
+import copy
+import inspect
+import threading
+import time
+from concurrent.futures import Future
+
+
 class Strategy:
     '''Interface to suggest moves for a GameState.
 
     Must be subclassed to a concrete strategy.  Our intention is
     to provide a uniform interface for functions that suggest moves.
+
+    in_place: bool  -- whether searches walk the game tree with
+                       GameState.push and pop instead of apply_move
+    oracle: bool    -- whether searches stop at states whose
+                       GameState.solved_outcome is known
+    stopped: bool   -- whether the running search was asked to stop
+    token: object   -- token of the running search, or None
+    lock: Lock      -- held by the thread searching with this strategy,
+                       if any, so that searches run one at a time
     '''
 
-    def __init__(self, interactive=False):
-        '''(Strategy, bool) -> NoneType
+    def __init__(self, interactive=False, in_place=False, oracle=False):
+        '''(Strategy, bool, bool, bool) -> NoneType
 
-        Create new Strategy (self), prompt user if interactive.
+        Create new Strategy (self), prompt user if interactive. If in_place,
+        searches push moves onto the state they are given and pop them off
+        again, rather than creating a new GameState for every node. If
+        oracle, searches take the exact outcome of any state that can
+        report one through solved_outcome instead of searching below it.
         '''
+        self.in_place, self.oracle = in_place, oracle
+        self.stopped, self.searching, self.token = False, False, None
+        self.lock, self.flags = threading.Lock(), threading.Lock()
 
     def suggest_move(self, state):
         '''(Strategy, GameState) -> Move
@@ -17,3 +41,147 @@ class Strategy:
         Suggest a next move for state.
         '''
         raise NotImplementedError('Must be implemented in subclass')
+
+    async def suggest_move_async(self, state, deadline=None):
+        '''(Strategy, GameState, float) -> Move
+
+        Suggest a next move for state without blocking the event loop: the
+        search runs in a daemon thread of its own, which does not keep the
+        program from exiting. Once time.monotonic() passes deadline, the
+        search is asked to stop, and the best move it found so far is
+        returned, or, for a search that does not keep one or has not
+        started yet, the move whose state has the best rough_outcome,
+        which the thread works out before it searches, or the first move
+        if it has not done so yet. Searches that take a deadline of their
+        own are given deadline too. If the caller is cancelled, the search
+        is asked to stop and CancelledError is raised.
+
+        Searches of one strategy run one at a time, so a search that does
+        not stop when asked delays the next one; only this call's own
+        search is ever stopped. If self.in_place, the search is given a
+        copy of state, so state can be used while the search finishes.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> from strategy_minimax_memoize import StrategyMinimaxMemoize
+        >>> s = StrategyMinimaxMemoize()
+        >>> state = SubtractSquareState('p1', current_total=21)
+        >>> print(asyncio.run(s.suggest_move_async(state)))
+        Remove 16
+        '''
+        moves = list(state.possible_next_moves())
+        if self.in_place:
+            state = copy.deepcopy(state)
+        kwargs = {}
+        if deadline is not None and \
+                'deadline' in inspect.signature(self.suggest_move).parameters:
+            kwargs['deadline'] = deadline
+
+        # result is also the token of this call's search, so that stop
+        # reaches no other
+        result, rough = Future(), Future()
+
+        def search():
+            # off the event loop, since rough_outcome may take a while
+            rough.set_result(self.rough_move(state) if moves else None)
+            with self.lock:
+                self.begin_search(result)
+                try:
+                    if result.set_running_or_notify_cancel():
+                        result.set_result(self.suggest_move(state, **kwargs))
+                except BaseException as error:
+                    result.set_exception(error)
+                finally:
+                    self.end_search()
+
+        threading.Thread(target=search, daemon=True).start()
+        future = asyncio.wrap_future(result)
+        timeout = None
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            move = None
+            if not result.cancel():
+                # this call's search started, so it may have a best move
+                self.stop(result)
+                move = self.best_move()
+                if result.done():
+                    # it finished, and another search may have begun since
+                    return result.result()
+            if move in moves:
+                return move
+            if rough.done():
+                return rough.result()
+            return moves[0] if moves else None
+        finally:
+            if not future.done() and not result.cancel():
+                self.stop(result)
+
+    def begin_search(self, search=None):
+        '''(Strategy, object) -> NoneType
+
+        Mark the start of a search that stop can reach, with token search
+        if it is given. The thread calling this must hold self.lock until
+        it calls end_search.
+        '''
+        with self.flags:
+            self.searching, self.stopped = True, False
+            self.token = search
+
+    def end_search(self):
+        '''(Strategy) -> bool
+
+        Mark the end of the search begun by begin_search, and return
+        whether it was asked to stop.
+        '''
+        with self.flags:
+            stopped = self.stopped
+            self.searching, self.stopped, self.token = False, False, None
+        return stopped
+
+    def stop(self, search=None):
+        '''(Strategy, object) -> NoneType
+
+        Ask the running search, if any, to stop as soon as it can, but
+        only if search is None or its token. Searches that do not look at
+        self.stopped run to the end, and searches started later are not
+        affected.
+        '''
+        with self.flags:
+            if self.searching and (search is None or search is self.token):
+                self.stopped = True
+
+    def best_move(self):
+        '''(Strategy) -> Move
+
+        Return the best move found so far by the running or last search,
+        or None if this strategy does not keep one.
+        '''
+        return None
+
+    def rough_move(self, state):
+        '''(Strategy, GameState) -> Move
+
+        Return the move of state that leaves the opponent the worst
+        rough_outcome.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> state = SubtractSquareState('p1', current_total=8)
+        >>> print(Strategy().rough_move(state))
+        Remove 1
+        '''
+        moves = state.possible_next_moves()
+        scores = [state.apply_move(i, True).rough_outcome() for i in moves]
+        return moves[scores.index(min(scores))]
+
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        '''(Strategy, GameState, int, float, float) -> float
+
+        Return the score of state for its next_player, as this strategy's
+        search finds it for a state ply moves below the state suggest_move
+        is given. A score at most cur_min, or at least opp_min, may only be
+        a bound on the score. This lets other code, such as
+        StrategyParallel, search parts of the game tree with any strategy.
+        '''
+        raise NotImplementedError('Must be implemented in subclass')
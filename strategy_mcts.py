@@ -0,0 +1,278 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from strategy import Strategy
+
+
+class MCTSNode:
+    ''' A node of the tree StrategyMCTS grows, for the state reached by
+    playing the moves from the root down to it.
+
+    move: Move          -- the move that reaches this node from its parent,
+                           or None for the root
+    player: str         -- the player who made move
+    parent: MCTSNode    -- the node above this one, or None for the root
+    children: list      -- the MCTSNodes of the moves tried so far
+    untried: list       -- the moves not tried yet
+    visits: int         -- playouts through this node
+    wins: float         -- their total reward for player: 1 for a win, 0.5
+                           for a draw and 0 for a loss
+    '''
+
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried',
+                 'visits', 'wins')
+
+    def __init__(self, move, player, parent, untried):
+        ''' (MCTSNode, Move, str, MCTSNode, list of Move) -> NoneType
+
+        Create a node that has not been visited yet.
+        '''
+
+        self.move, self.player, self.parent = move, player, parent
+        self.children, self.untried = [], untried
+        self.visits, self.wins = 0, 0.0
+
+    def select(self, exploration):
+        ''' (MCTSNode, float) -> MCTSNode
+
+        Return the child of self with the highest upper confidence bound
+        (UCT), which favours children with a high average reward and
+        children visited less often than their siblings.
+
+        >>> root = MCTSNode(None, 'p2', None, [])
+        >>> a, b = MCTSNode(1, 'p1', root, []), MCTSNode(2, 'p1', root, [])
+        >>> root.children, root.visits = [a, b], 20
+        >>> a.visits, a.wins, b.visits, b.wins = 15, 9.0, 5, 2.0
+        >>> root.select(0.0).move, root.select(2.0).move
+        (1, 2)
+        '''
+
+        log_visits = math.log(self.visits)
+        best, best_bound = None, -1.0
+        for child in self.children:
+            bound = (child.wins / child.visits + exploration *
+                     math.sqrt(log_visits / child.visits))
+            if bound > best_bound:
+                best, best_bound = child, bound
+        return best
+
+
+class StrategyMCTS(Strategy):
+    ''' Interface for suggesting moves
+
+    Uses Monte Carlo tree search: it grows a tree of moves from the state
+    it is given, one node per iteration. Each iteration goes down the
+    tree choosing the child with the highest upper confidence bound
+    (UCT), adds one untried move there, plays random moves until the game
+    is over, and credits the outcome to every node on the way. The move
+    suggested is the one visited most. Nothing but possible_next_moves,
+    apply_move (or push and pop) and outcome is needed, so it gives
+    useful moves on boards far too big to search exhaustively.
+
+    With workers above 1, that many processes each grow a tree of their
+    own (root parallelization), and the visits of the moves of all of
+    them are added up.
+
+    iterations: int     -- iterations per move when suggest_move is given
+                           no budget, or None for no limit
+    time_limit: float   -- seconds per move when suggest_move is given no
+                           budget, or None for no limit
+    exploration: float  -- how much UCT favours moves visited less
+    workers: int        -- number of processes that search
+    root: MCTSNode      -- the root of the tree of the last suggest_move,
+                           in this process
+    visits: dict        -- visits of each move at the root, in all
+                           processes, during the last suggest_move
+    '''
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 iterations=None, time_limit=1.0, exploration=math.sqrt(2),
+                 workers=1):
+        ''' (StrategyMCTS, bool, bool, bool, int, float, float, int) -> None
+
+        Initialize a Monte Carlo tree search strategy that stops after
+        iterations iterations or time_limit seconds, whichever comes first.
+        Raise ValueError if both are None, since a search would never end.
+
+        >>> StrategyMCTS(time_limit=None)
+        Traceback (most recent call last):
+        ...
+        ValueError: StrategyMCTS needs iterations or a time_limit
+        '''
+
+        if iterations is None and time_limit is None:
+            raise ValueError('StrategyMCTS needs iterations or a time_limit')
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.iterations, self.time_limit = iterations, time_limit
+        self.exploration, self.workers = exploration, workers
+        self.random, self.pool = random.Random(), None
+        self.root, self.visits = None, {}
+
+    def suggest_move(self, state, deadline=None, iterations=None):
+        ''' (StrategyMCTS, GameState, float, int) -> Move
+
+        Return the move visited most by a search that stops after
+        iterations iterations or once time.monotonic() passes deadline.
+        With neither, use self.iterations and self.time_limit.
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMCTS(iterations=2000, time_limit=None)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=8)))
+        Remove 1
+        '''
+
+        if deadline is None and iterations is None:
+            iterations = self.iterations
+            if self.time_limit is not None:
+                deadline = time.monotonic() + self.time_limit
+        if self.workers <= 1:
+            self.search(state, deadline, iterations)
+            self.visits = {}
+            for child in self.root.children:
+                self.visits[child.move] = child.visits
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.workers)
+            # the trees are in the other processes, so until their visits
+            # are added up there is no best move
+            self.root, self.visits = None, {}
+            share = None
+            if iterations is not None:
+                share = -(-iterations // self.workers)
+            futures = [self.pool.submit(
+                root_visits, state, deadline, share, self.exploration,
+                self.in_place, self.oracle, self.random.getrandbits(32))
+                for i in range(self.workers)]
+            for future in futures:
+                for (move, visits) in future.result():
+                    self.visits[move] = self.visits.get(move, 0) + visits
+        moves = state.possible_next_moves()
+        return max(moves, key=lambda i: self.visits.get(i, 0))
+
+    def best_move(self):
+        ''' (StrategyMCTS) -> Move
+
+        Return the move visited most so far by the tree of the running or
+        last search in this process, or, with workers above 1, by all the
+        trees of the last search, or None if there is none
+        Override Strategy.best_move
+        '''
+
+        if self.root is not None and self.root.children:
+            return max(self.root.children,
+                       key=lambda child: child.visits).move
+        if self.visits:
+            return max(self.visits, key=lambda i: self.visits[i])
+        return None
+
+    def close(self):
+        ''' (StrategyMCTS) -> NoneType
+
+        Shut down the processes of self, if any.
+        '''
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def search(self, state, deadline=None, iterations=None):
+        ''' (StrategyMCTS, GameState, float, int) -> MCTSNode
+
+        Grow a new tree from state for iterations iterations, until
+        time.monotonic() passes deadline or until the search is asked to
+        stop, and return its root, which is also kept as self.root. At
+        least one iteration is run.
+        '''
+
+        self.root = MCTSNode(None, None, None,
+                             list(state.possible_next_moves()))
+        done = 0
+        while done == 0 or ((iterations is None or done < iterations) and
+                            (deadline is None or
+                             time.monotonic() < deadline) and
+                            not self.stopped):
+            self.iterate(state)
+            done += 1
+        return self.root
+
+    def iterate(self, state):
+        ''' (StrategyMCTS, GameState) -> NoneType
+
+        Run one iteration of the search of self.root, which is the node of
+        state: select a node, expand it, play it out at random and credit
+        the outcome to the nodes on the way. If self.in_place, the moves
+        are pushed onto state and popped off again.
+        '''
+
+        node, pushed = self.root, 0
+        # go down while every move of the node has been tried
+        while not node.untried and node.children:
+            node = node.select(self.exploration)
+            state, pushed = self.play(state, node.move, pushed)
+        if node.untried:
+            # try one more move of the node
+            i = self.random.randrange(len(node.untried))
+            move = node.untried[i]
+            node.untried[i] = node.untried[-1]
+            node.untried.pop()
+            player = state.next_player
+            state, pushed = self.play(state, move, pushed)
+            child = MCTSNode(move, player, node,
+                             list(state.possible_next_moves()))
+            node.children.append(child)
+            node = child
+
+        # play random moves until the outcome is known
+        while not state.over and not (self.oracle and
+                                      state.solved_outcome() is not None):
+            state, pushed = self.play(
+                state, self.random.choice(state.possible_next_moves()),
+                pushed)
+        if state.over:
+            outcome = state.outcome()
+        else:
+            outcome = state.solved_outcome()
+        last = state.next_player
+        for i in range(pushed):
+            state.pop()
+
+        # credit the outcome to the player who moved into each node
+        win = (1.0 + outcome) / 2
+        while node is not None:
+            node.visits += 1
+            node.wins += win if node.player == last else 1.0 - win
+            node = node.parent
+
+    def play(self, state, move, pushed):
+        ''' (StrategyMCTS, GameState, Move, int) -> (GameState, int)
+
+        Return the state reached by applying move to state, and the number
+        of moves pushed onto state so far, which is pushed plus one if
+        self.in_place
+        '''
+
+        if self.in_place:
+            state.push(move)
+            return state, pushed + 1
+        else:
+            return state.apply_move(move, True), pushed
+
+
+def root_visits(state, deadline, iterations, exploration, in_place, oracle,
+                seed):
+    ''' (GameState, float, int, float, bool, bool, int)
+        -> list of (Move, int)
+
+    Return the visits of each move searched by StrategyMCTS from state,
+    with the given budget, exploration, in_place and oracle, using seed
+    for its random choices. This is the work each process of a
+    StrategyMCTS does.
+    '''
+
+    strategy = StrategyMCTS(in_place=in_place, oracle=oracle,
+                            exploration=exploration)
+    strategy.random.seed(seed)
+    root = strategy.search(state, deadline, iterations)
+    return [(child.move, child.visits) for child in root.children]
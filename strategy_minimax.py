@@ -12,6 +12,15 @@ class StrategyMinimax(Strategy):
         
         return self.minimax(state)[1]
     
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimax, GameState, int, float, float) -> int
+        
+        Return result of state
+        Override Strategy.evaluate
+        '''
+        
+        return self.result(state)
+    
     def minimax(self, state):
         ''' (StrategyMinimax, GameState) -> (int, Move)
         
@@ -23,8 +32,7 @@ class StrategyMinimax(Strategy):
         moves = state.possible_next_moves()
         
         # find opponent's score for each option, multiply by (-1)
-        scores = [(-1)*self.result(state.apply_move(i)) 
-                  for i in state.possible_next_moves()]
+        scores = self.scores(state, moves)
         
         # find the maximum score available
         score = max(scores)
@@ -45,14 +53,34 @@ class StrategyMinimax(Strategy):
         if state.over:
             # if game is over, return outcome for next_player
             return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search
+            return state.solved_outcome()
         else:
             # if game is not over, run through all possible_next_moves
-            states = [state.apply_move(i) 
-                      for i in state.possible_next_moves()]
-            
             # for each new hypothetical state, find (-1)*result
             # multiplied by (-1) since result is opponent's score
-            scores = [(-1)*self.result(i) for i in states]
+            scores = self.scores(state, state.possible_next_moves())
             
             # return the maximum of the scores for each result
-            return max(scores)
\ No newline at end of file
+            return max(scores)
+    
+    def scores(self, state, moves):
+        ''' (StrategyMinimax, GameState, list of Move) -> list of int
+        
+        Return the score of each of moves for the next_player of state,
+        that is, (-1) times the result for the state each move leads to
+        
+        If self.in_place, each move is pushed onto state and popped off
+        again, so state is unchanged when this returns
+        '''
+        
+        if self.in_place:
+            scores = []
+            for i in moves:
+                state.push(i)
+                scores.append((-1)*self.result(state))
+                state.pop()
+            return scores
+        else:
+            return [(-1)*self.result(state.apply_move(i, True)) for i in moves]
\ No newline at end of file
@@ -0,0 +1,212 @@
+import time
+from strategy_minimax_myopic import StrategyMinimaxMyopic
+
+
+class SearchTimeout(Exception):
+    ''' Raised inside a search when its budget of time or states runs out
+    '''
+
+
+class StrategyMinimaxDeepening(StrategyMinimaxMyopic):
+    ''' Interface for suggesting moves
+
+    Uses myopic minimax algorithm with pruning, searching one level deeper
+    at a time until a deadline or a number of states runs out, and
+    suggests the best move of the deepest search that finished. Each
+    search first tries the moves the previous one found best, which is
+    what lets it prune most of the tree.
+
+    time_limit: float  -- seconds to spend on a move when suggest_move is
+                          given no budget
+    max_depth: int     -- deepest search to run
+    depth: int         -- depth of the deepest search that finished during
+                          the last suggest_move
+    nodes: int         -- states searched during the last suggest_move
+    move: Move         -- best move of the deepest search finished so far
+    '''
+
+    # number of states searched between looks at the clock
+    CHECK_EVERY = 256
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 time_limit=1.0, max_depth=64):
+        ''' (StrategyMinimaxDeepening, bool, bool, bool, float, int)
+            -> NoneType
+
+        Initialize a deepening strategy that spends time_limit seconds on
+        each move, unless told otherwise, and searches at most max_depth
+        levels
+        '''
+
+        StrategyMinimaxMyopic.__init__(self, interactive, in_place, oracle)
+        self.time_limit, self.max_depth = time_limit, max_depth
+        self.depth = self.nodes = 0
+        self.deadline = self.max_nodes = None
+        self.best, self.limited, self.partial = {}, False, None
+        self.move = None
+
+    def suggest_move(self, state, deadline=None, max_nodes=None):
+        ''' (StrategyMinimaxDeepening, GameState, float, int) -> Move
+
+        Return the best move found by searching deeper and deeper until
+        time.monotonic() passes deadline or max_nodes states have been
+        searched. With neither, the deadline is self.time_limit seconds
+        from now.
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxDeepening(max_depth=20)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21),
+        ...                      max_nodes=10**5))
+        Remove 16
+        >>> s.depth < 20
+        True
+        '''
+
+        if deadline is None and max_nodes is None:
+            deadline = time.monotonic() + self.time_limit
+        self.deadline, self.max_nodes = deadline, max_nodes
+        self.nodes, self.depth, self.best = 0, 0, {}
+
+        moves = list(state.possible_next_moves())
+        move = self.move = moves[0]
+        self.partial = None
+        for depth in range(1, self.max_depth + 1):
+            self.limited, self.partial = False, None
+            try:
+                scores = self.root_scores(state, moves, depth)
+            except SearchTimeout:
+                # a move that beat the previous best at this depth is
+                # better informed than the previous best itself
+                if self.partial is not None:
+                    move = self.partial
+                break
+            # search the best moves of this depth first at the next one
+            order = sorted(range(len(moves)), key=lambda i: -scores[i])
+            moves = [moves[i] for i in order]
+            move, self.depth = moves[0], depth
+            self.move = move
+            if not self.limited:
+                # no search stopped at the depth limit, so deeper
+                # searches would find the same scores
+                break
+        return move
+
+    def root_scores(self, state, moves, depth):
+        ''' (StrategyMinimaxDeepening, GameState, list of Move, int)
+            -> list of float
+
+        Return the score of each of moves, searching depth levels in
+        all. Only the score of the first best move is exact, the others
+        are at most their exact score.
+        '''
+
+        scores, best = [], state.LOSE
+        for i in moves:
+            score = (-1) * self.score(state, i, depth - 1,
+                                      -state.WIN, -best)
+            scores.append(score)
+            if score > best or len(scores) == 1:
+                best = score
+                if len(scores) > 1:
+                    self.partial = i
+        return scores
+
+    def minimax(self, state, depth=5, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxDeepening, GameState, int, float, float)
+            -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        Only expand game tree to a maximum depth of depth, and stop
+        expanding the moves of a state once one of them is at least
+        opp_min for the next_player. Remember the best move of each
+        state, to be searched first next time.
+
+        Return a float between -1.0 and 1.0
+        '''
+
+        self.nodes += 1
+        if self.nodes % StrategyMinimaxDeepening.CHECK_EVERY == 0 or \
+                self.nodes == self.max_nodes:
+            self.check_budget()
+
+        if state.over:
+            # if game is over, return outcome for next_player
+            return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search
+            return state.solved_outcome()
+        elif depth == 0:
+            # if maximum depth has been reached, return the rough_outcome
+            self.limited = True
+            return state.rough_outcome()
+
+        key = state.key()
+        moves = state.possible_next_moves()
+        first = self.best.get(key)
+        if first is not None and first in moves:
+            moves = [first] + [i for i in moves if i != first]
+
+        score, move = state.LOSE, None
+        for i in moves:
+            # find opponent's score, multiplied by (-1) since minimax
+            # returns opponent's score, with the bounds swapped likewise
+            i_score = (-1) * self.score(state, i, depth - 1,
+                                        -opp_min, -cur_min)
+            if move is None or i_score > score:
+                score, move = i_score, i
+            cur_min = max(score, cur_min)
+
+            # if cur_min is better than opp_min, stop searching
+            if cur_min >= opp_min:
+                break
+        self.best[key] = move
+        return score
+
+    def best_move(self):
+        ''' (StrategyMinimaxDeepening) -> Move
+
+        Return the best move found so far by the running or last
+        suggest_move
+        Override Strategy.best_move
+        '''
+
+        # a move that beat the best so far at the current depth is better
+        # informed than the best of the previous depth
+        return self.move if self.partial is None else self.partial
+
+    def check_budget(self):
+        ''' (StrategyMinimaxDeepening) -> NoneType
+
+        Raise SearchTimeout if the deadline has passed, max_nodes states
+        have been searched or the search was asked to stop
+        '''
+
+        if (self.max_nodes is not None and self.nodes >= self.max_nodes) \
+                or (self.deadline is not None and
+                    time.monotonic() >= self.deadline) or self.stopped:
+            raise SearchTimeout()
+
+    def score(self, state, move, depth, cur_min, opp_min):
+        ''' (StrategyMinimaxDeepening, GameState, Move, int, float, float)
+            -> float
+
+        Return minimax of the state reached by applying move to state,
+        with the given depth, cur_min and opp_min
+
+        If self.in_place, move is pushed onto state and popped off again,
+        so state is unchanged when this returns, even if the search runs
+        out of budget
+        '''
+
+        if self.in_place:
+            state.push(move)
+            try:
+                return self.minimax(state, depth, cur_min, opp_min)
+            finally:
+                state.pop()
+        else:
+            return self.minimax(state.apply_move(move, True), depth,
+                                cur_min, opp_min)
@@ -0,0 +1,71 @@
+from strategy_minimax import StrategyMinimax
+
+
+class StrategyMinimaxIterative(StrategyMinimax):
+    ''' minimax strategy
+
+    Gives the same results as StrategyMinimax, but result keeps its own
+    stack of the states being searched instead of calling itself, so the
+    depth of a search is not bounded by Python's recursion limit, and no
+    Python frame is made for each state.
+    '''
+
+    def result(self, state):
+        ''' (StrategyMinimaxIterative, GameState) -> int
+
+        Return score for the given game state – how favourable the game is
+        for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+        Override StrategyMinimax.result
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> state = SubtractSquareState('p1', current_total=21)
+        >>> StrategyMinimaxIterative().result(state)
+        1.0
+        '''
+
+        in_place = self.in_place
+        # each frame is [state, moves, index of the move being searched,
+        # best score so far] for a state whose moves are being searched
+        stack = []
+        while True:
+            if state.over:
+                # if game is over, the score is outcome for next_player
+                score = state.outcome()
+            elif self.oracle and state.solved_outcome() is not None:
+                # if the game knows the outcome, there is no need to search
+                score = state.solved_outcome()
+            else:
+                # search the first of the moves, and come back for the rest
+                moves = state.possible_next_moves()
+                stack.append([state, moves, 0, state.LOSE])
+                if in_place:
+                    state.push(moves[0])
+                else:
+                    state = state.apply_move(moves[0], True)
+                continue
+
+            # hand score up to the states above, until one of them has a
+            # move left to search
+            while stack:
+                frame = stack[-1]
+                state, moves = frame[0], frame[1]
+                if in_place:
+                    state.pop()
+                # multiplied by (-1) since score is the opponent's
+                if -score > frame[3]:
+                    frame[3] = -score
+                n = frame[2] = frame[2] + 1
+                if n < len(moves):
+                    if in_place:
+                        state.push(moves[n])
+                    else:
+                        state = state.apply_move(moves[n], True)
+                    break
+                stack.pop()
+                score = frame[3]
+            else:
+                return score
@@ -1,25 +1,58 @@
 from strategy import Strategy
+from transposition_table import TranspositionTable
 
 
 class StrategyMinimaxMemoize(Strategy):
     ''' Interface for suggesting moves
     
     Uses memoizing minimax algorithm that stores scores of GameStates in a
-    dictionary to avoid redunancies in expanding the game tree
+    TranspositionTable to avoid redunancies in expanding the game tree
     
-    DATA: dict  -- dictionary storing scores of GameStates
+    The tables are bounded in size, so they are kept from one move and one
+    game to the next instead of being emptied. Each entry's depth is the
+    number of nodes searched to compute it, so the default 'depth' policy
+    keeps the most expensive results.
+    
+    DATA: dict  -- TranspositionTable shared by all instances for each
+                   GameState subclass, since keys of different games
+                   may clash
+    SHARED_TABLE: bool  -- whether table may be a SharedTranspositionTable,
+                           as it may for this and every subclass
+    table: TranspositionTable  -- table to use for every game instead of
+                                  those in DATA, or None
+    nodes: int  -- number of states searched so far
     '''
     
     DATA = {}
+    SHARED_TABLE = True
+    
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 table=None):
+        ''' (StrategyMinimaxMemoize, bool, bool, bool, TranspositionTable)
+            -> None
+        
+        Initialize a minimax memoize strategy, storing scores in table if
+        it is given
+        '''
+        
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.table, self.nodes = table, 0
     
-    def __init__(self, interactive=False):
-        ''' (StrategyMinimaxMemoize, bool) -> None
+    def table_for(self, state):
+        ''' (StrategyMinimaxMemoize, GameState) -> TranspositionTable
         
-        Initialize a minimax memoize strategy
+        Return the table that stores scores for states like state
         '''
         
-        # empty the dictionary to avoid overlap of memory between games
-        StrategyMinimaxMemoize.DATA = {}
+        if self.table is not None:
+            return self.table
+        # self.DATA, so that subclasses storing other kinds of entries can
+        # keep tables of their own
+        table = self.DATA.get(type(state))
+        if table is None:
+            table = TranspositionTable()
+            self.DATA[type(state)] = table
+        return table
     
     def suggest_move(self, state):
         ''' (StrategyMinimaxMemoize, GameState) -> Move 
@@ -32,14 +65,22 @@ class StrategyMinimaxMemoize(Strategy):
         moves = state.possible_next_moves()
         
         # find opponent's score for each option, multiply by (-1)
-        scores = [(-1) * self.minimax(state.apply_move(i)) 
-                  for i in state.possible_next_moves()]
+        scores = self.scores(state, moves)
         
         # find the maximum score available
         score = max(scores)
         
         return moves[scores.index(score)]
     
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxMemoize, GameState, int, float, float) -> float
+        
+        Return minimax of state
+        Override Strategy.evaluate
+        '''
+        
+        return self.minimax(state)
+    
     def minimax(self, state):
         ''' (StrategyMinimax, GameState) -> float
         
@@ -50,26 +91,52 @@ class StrategyMinimaxMemoize(Strategy):
         Elif a tying strategy is available, return 0
         Else return -1
         
-        While game tree is traversed, store scores for GameStates in DATA 
+        While game tree is traversed, store scores for GameStates in the
+        table from table_for
         '''
         
-        if repr(state) in StrategyMinimaxMemoize.DATA:
-            # if game is known, return value from dictionary
-            return StrategyMinimaxMemoize.DATA[repr(state)]            
+        table, key = self.table_for(state), state.key()
+        score = table.get(key)
+        self.nodes += 1
+        if score is not None:
+            # if game is known, return value from table
+            return score
         elif state.over:
-            # if game is over, return outcome, assign value to dictionary
-            StrategyMinimaxMemoize.DATA[repr(state)] = state.outcome()
+            # if game is over, return outcome, assign value to table
+            table.store(key, state.outcome(), 1)
             return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, assign it to table
+            table.store(key, state.solved_outcome(), 1)
+            return state.solved_outcome()
         else:
+            start = self.nodes
             # if game is not over, run through all possible_next_moves
-            states = [state.apply_move(i) 
-                      for i in state.possible_next_moves()]
-            
             # for each new hypothetical state, find (-1) * score
             # multiplied by (-1) since miminax returns opponent's score
-            scores = [(-1) * self.minimax(i) for i in states]
+            scores = self.scores(state, state.possible_next_moves())
             
             # return the maximum of the scores for each move
-            # assign this value to dictionary
-            StrategyMinimaxMemoize.DATA[repr(state)] = max(scores)
-            return max(scores)
\ No newline at end of file
+            # assign this value to table, with the size of the search
+            table.store(key, max(scores), self.nodes - start + 1)
+            return max(scores)
+    
+    def scores(self, state, moves):
+        ''' (StrategyMinimaxMemoize, GameState, list of Move) -> list of float
+        
+        Return the score of each of moves for the next_player of state
+        
+        If self.in_place, each move is pushed onto state and popped off
+        again, so state is unchanged when this returns
+        '''
+        
+        if self.in_place:
+            scores = []
+            for i in moves:
+                state.push(i)
+                scores.append((-1) * self.minimax(state))
+                state.pop()
+            return scores
+        else:
+            return [(-1) * self.minimax(state.apply_move(i, True))
+                    for i in moves]
\ No newline at end of file
@@ -0,0 +1,86 @@
+from strategy_minimax_memoize import StrategyMinimaxMemoize
+
+
+class StrategyMinimaxMemoizeIterative(StrategyMinimaxMemoize):
+    ''' Interface for suggesting moves
+
+    Gives the same results as StrategyMinimaxMemoize, and shares its
+    tables, but minimax keeps its own stack of the states being searched
+    instead of calling itself, so the depth of a search is not bounded by
+    Python's recursion limit, and no Python frame is made for each state.
+    '''
+
+    def minimax(self, state):
+        ''' (StrategyMinimaxMemoizeIterative, GameState) -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+
+        While game tree is traversed, store scores for GameStates in the
+        table from table_for
+        Override StrategyMinimaxMemoize.minimax
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxMemoizeIterative()
+        >>> s.minimax(SubtractSquareState('p1', current_total=5000))
+        1.0
+        '''
+
+        table, in_place = self.table_for(state), self.in_place
+        get, store, nodes = table.get, table.store, self.nodes
+        # each frame is [state, key, moves, index of the move being
+        # searched, best score so far, nodes before state was searched]
+        stack = []
+        while True:
+            key = state.key()
+            score = get(key)
+            nodes += 1
+            if score is not None:
+                # if game is known, the score is the value from table
+                pass
+            elif state.over:
+                # if game is over, the score is outcome, assign it to table
+                score = state.outcome()
+                store(key, score, 1)
+            elif self.oracle and state.solved_outcome() is not None:
+                # if the game knows the outcome, assign it to table
+                score = state.solved_outcome()
+                store(key, score, 1)
+            else:
+                # search the first of the moves, and come back for the rest
+                moves = state.possible_next_moves()
+                stack.append([state, key, moves, 0, state.LOSE, nodes - 1])
+                if in_place:
+                    state.push(moves[0])
+                else:
+                    state = state.apply_move(moves[0], True)
+                continue
+
+            # hand score up to the states above, until one of them has a
+            # move left to search
+            while stack:
+                frame = stack[-1]
+                state, moves = frame[0], frame[2]
+                if in_place:
+                    state.pop()
+                # multiplied by (-1) since score is the opponent's
+                if -score > frame[4]:
+                    frame[4] = -score
+                n = frame[3] = frame[3] + 1
+                if n < len(moves):
+                    if in_place:
+                        state.push(moves[n])
+                    else:
+                        state = state.apply_move(moves[n], True)
+                    break
+                # assign the score to table, with the size of the search
+                stack.pop()
+                score = frame[4]
+                store(frame[1], score, nodes - frame[5])
+            else:
+                self.nodes = nodes
+                return score
@@ -0,0 +1,181 @@
+from strategy import Strategy
+from transposition_table import TranspositionTable
+
+
+class StrategyMinimaxMTDF(Strategy):
+    ''' Interface for suggesting moves
+
+    Uses the MTD(f) algorithm to find the myopic minimax score, the score
+    StrategyMinimaxMyopic finds at the same depth, through a series of
+    passes of pruning minimax with a null window. Each pass only tells
+    whether the score is above or below a guess, and the guesses close in
+    on the score from both sides. What each pass learns is stored in a
+    TranspositionTable as bounds on the score of each state, so later
+    passes, and later moves, search little that was searched before.
+    The first guess is the score of the previous move.
+
+    depth: int           -- number of levels to search below each move
+                            of the state suggest_move is given, as
+                            StrategyMinimaxMyopic does
+    table: TranspositionTable -- bounds on the scores of states, as tuples
+                                 (lower, upper, move), where move is the
+                                 best move found; an entry's depth is the
+                                 number of levels searched below the state
+    guess: float         -- first guess of the next suggest_move
+    passes: int          -- passes during the last suggest_move
+    pass_nodes: list     -- states searched by each of those passes
+    nodes: int           -- states searched during the last suggest_move
+    '''
+
+    # width of a null window: smaller than the difference between any two
+    # scores that are not equal
+    NULL = 1e-9
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 depth=5, table=None):
+        ''' (StrategyMinimaxMTDF, bool, bool, bool, int, TranspositionTable)
+            -> None
+
+        Initialize an MTD(f) strategy searching depth levels below each
+        move, storing bounds in table if it is given, or in a new table
+        otherwise. Keys of different games may clash, so a table should
+        only ever be used for one kind of GameState.
+        '''
+
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.depth = depth
+        self.table = TranspositionTable() if table is None else table
+        self.guess, self.passes, self.pass_nodes = 0.0, 0, []
+        self.nodes, self.move = 0, None
+
+    def suggest_move(self, state):
+        ''' (StrategyMinimaxMTDF, GameState) -> Move
+
+        Use MTD(f) to return the move reaching the best myopic score
+        Override Strategy.suggest_move
+
+        >>> from tippy_game_state import TippyGameState
+        >>> s = StrategyMinimaxMTDF()
+        >>> print(s.suggest_move(TippyGameState('p1')))
+        Row: 1  Column: 2
+        >>> s.passes > 1
+        True
+        '''
+
+        self.guess = self.mtdf(state, self.guess)
+        return self.move
+
+    def mtdf(self, state, guess):
+        ''' (StrategyMinimaxMTDF, GameState, float) -> float
+
+        Return the myopic score of state, searching self.depth levels
+        below each of its moves and starting with guess as the first
+        guess, and remember the best move as self.move.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> StrategyMinimaxMTDF(depth=3).mtdf(
+        ...     SubtractSquareState('p1', current_total=10), 0.5)
+        -1.0
+        '''
+
+        self.passes, self.pass_nodes, self.nodes = 0, [], 0
+        lower, upper = float('-inf'), float('inf')
+        score, self.move = guess, state.possible_next_moves()[0]
+        while lower < upper:
+            # test whether the score is at least beta
+            beta = max(score, lower + StrategyMinimaxMTDF.NULL)
+            start = self.nodes
+            # the moves of state are searched self.depth levels deep
+            score = self.minimax(state, self.depth + 1,
+                                 beta - StrategyMinimaxMTDF.NULL, beta, True)
+            self.passes += 1
+            self.pass_nodes.append(self.nodes - start)
+            if score < beta:
+                upper = score
+            else:
+                lower = score
+        return score
+
+    def minimax(self, state, depth, cur_min, opp_min, root=False):
+        ''' (StrategyMinimaxMTDF, GameState, int, float, float, bool)
+            -> float
+
+        Return the score of state for its next_player, searching depth
+        levels below it. If the score is at most cur_min, only a score
+        between it and cur_min is returned, and likewise if it is at
+        least opp_min. If root, and the score is at least opp_min,
+        remember the move that reaches it as self.move.
+        '''
+
+        self.nodes += 1
+        if state.over:
+            # if game is over, return outcome for next_player
+            return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search
+            return state.solved_outcome()
+        elif depth == 0:
+            # if maximum depth has been reached, return the rough_outcome
+            return state.rough_outcome()
+
+        key = state.key()
+        entry = self.table.probe(key)
+        lower, upper, first = float('-inf'), float('inf'), None
+        if entry is not None and entry[1] == depth:
+            # bounds are only valid for the same depth
+            lower, upper, first = entry[0]
+            # the root must be searched to find its move
+            if lower >= opp_min and not root:
+                return lower
+            elif upper <= cur_min and not root:
+                return upper
+        first_min = cur_min
+
+        moves = state.possible_next_moves()
+        if first is not None and first in moves:
+            moves = [first] + [i for i in moves if i != first]
+        score, move = state.LOSE, None
+        for i in moves:
+            # find opponent's score, multiplied by (-1) since minimax
+            # returns opponent's score, with the bounds swapped likewise
+            i_score = (-1) * self.score(state, i, depth - 1,
+                                        -opp_min, -cur_min)
+            if move is None or i_score > score:
+                score, move = i_score, i
+            cur_min = max(score, cur_min)
+
+            # if cur_min is better than opp_min, stop searching
+            if cur_min >= opp_min:
+                break
+
+        # narrow the bounds already known by what this search found
+        if score <= first_min:
+            upper = score
+        elif score >= opp_min:
+            lower = score
+        else:
+            lower = upper = score
+        self.table.store(key, (lower, upper, move), depth)
+        if root and score >= opp_min:
+            self.move = move
+        return score
+
+    def score(self, state, move, depth, cur_min, opp_min):
+        ''' (StrategyMinimaxMTDF, GameState, Move, int, float, float)
+            -> float
+
+        Return minimax of the state reached by applying move to state,
+        with the given depth, cur_min and opp_min
+
+        If self.in_place, move is pushed onto state and popped off again,
+        so state is unchanged when this returns
+        '''
+
+        if self.in_place:
+            state.push(move)
+            score = self.minimax(state, depth, cur_min, opp_min)
+            state.pop()
+            return score
+        else:
+            return self.minimax(state.apply_move(move, True), depth,
+                                cur_min, opp_min)
@@ -6,8 +6,19 @@ class StrategyMinimaxMyopic(Strategy):
     
     Uses myopic minimax algorithm that determines the best move only to
     a limited recursion depth, in this case 5
+    
+    nodes: int  -- states searched during the last suggest_move
     '''
     
+    def __init__(self, interactive=False, in_place=False, oracle=False):
+        ''' (StrategyMinimaxMyopic, bool, bool, bool) -> None
+        
+        Initialize a minimax myopic strategy
+        '''
+        
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.nodes = 0
+    
     def suggest_move(self, state):
         ''' (StrategyMinimax, GameState) -> Move 
         
@@ -17,17 +28,27 @@ class StrategyMinimaxMyopic(Strategy):
         '''
         
         # make a list of options
+        self.nodes = 0
         moves = state.possible_next_moves()
         
         # find opponent's score for each option, multiply by (-1)
-        scores = [(-1) * self.minimax(state.apply_move(i)) 
-                  for i in state.possible_next_moves()]
+        scores = self.scores(state, moves, 5)
         
         # find the maximum score available
         score = max(scores)
         
         return moves[scores.index(score)]
     
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxMyopic, GameState, int, float, float) -> float
+        
+        Return minimax of state, searching as deep as suggest_move would
+        below a state ply moves down
+        Override Strategy.evaluate
+        '''
+        
+        return self.minimax(state, max(5 - (ply - 1), 0))
+    
     def minimax(self, state, depth=5):
         '''(StrategyMinimax, GameState, int) -> float
         
@@ -39,20 +60,43 @@ class StrategyMinimaxMyopic(Strategy):
         Return a float between -1.0 and 1.0
         '''
         
+        self.nodes += 1
         if state.over:
             # if game is over, return outcome for next_player
             return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search
+            return state.solved_outcome()
         elif depth == 0:
             # if maximum depth has been reached, return the rough_outcome
             return state.rough_outcome()
         else:
             # if game is not over, run through all possible_next_moves
-            states = [state.apply_move(i) for i in 
-                      state.possible_next_moves()]
-            
             # for each new hypothetical state, find (-1) * score
             # multiplied by (-1) since minimax returns opponent's score
-            scores = [(-1) * self.minimax(i, depth - 1) for i in states]
+            scores = self.scores(state, state.possible_next_moves(), depth - 1)
             
             # return the maximum of the scores for each move
-            return max(scores)
\ No newline at end of file
+            return max(scores)
+    
+    def scores(self, state, moves, depth):
+        ''' (StrategyMinimaxMyopic, GameState, list of Move, int)
+            -> list of float
+        
+        Return the score of each of moves for the next_player of state,
+        searching depth more levels below each of them
+        
+        If self.in_place, each move is pushed onto state and popped off
+        again, so state is unchanged when this returns
+        '''
+        
+        if self.in_place:
+            scores = []
+            for i in moves:
+                state.push(i)
+                scores.append((-1) * self.minimax(state, depth))
+                state.pop()
+            return scores
+        else:
+            return [(-1) * self.minimax(state.apply_move(i, True), depth)
+                    for i in moves]
\ No newline at end of file
@@ -0,0 +1,108 @@
+from strategy_minimax_memoize import StrategyMinimaxMemoize
+from persistent_table import PersistentTable
+
+
+class StrategyMinimaxPersistent(StrategyMinimaxMemoize):
+    ''' Interface for suggesting moves
+
+    A StrategyMinimaxMemoize whose tables are PersistentTables in the
+    database at path, one for each GameState subclass, stored under its
+    module and name with its KEY_VERSION. Scores found by any game, any
+    earlier run, or any process that wrote them before this strategy first
+    looked at the game, are looked up instead of being searched again, so
+    once a game has been solved, later solves take hardly any time. New
+    scores are written at the end of each suggest_move and evaluate.
+
+    path: str     -- the database file
+    tables: dict  -- the PersistentTable of this strategy for each
+                     GameState subclass
+    '''
+
+    PATH = 'minimax_memoize.sqlite3'
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 table=None, path=PATH):
+        ''' (StrategyMinimaxPersistent, bool, bool, bool, TranspositionTable,
+             str) -> None
+
+        Initialize a minimax memoize strategy storing scores in the
+        database at path, or in table if it is given
+        '''
+
+        StrategyMinimaxMemoize.__init__(self, interactive, in_place, oracle,
+                                        table)
+        self.path, self.tables = path, {}
+
+    def table_for(self, state):
+        ''' (StrategyMinimaxPersistent, GameState) -> TranspositionTable
+
+        Return the table that stores scores for states like state
+        Override StrategyMinimaxMemoize.table_for
+        '''
+
+        if self.table is not None:
+            return self.table
+        table = self.tables.get(type(state))
+        if table is None:
+            game = type(state)
+            table = PersistentTable(
+                self.path, '{}.{}'.format(game.__module__, game.__name__),
+                game.KEY_VERSION)
+            self.tables[type(state)] = table
+        return table
+
+    def suggest_move(self, state):
+        ''' (StrategyMinimaxPersistent, GameState) -> Move
+
+        Use minimax to return the move reaching the best score, and write
+        the new scores to the database
+        Override StrategyMinimaxMemoize.suggest_move
+
+        >>> import os, tempfile
+        >>> from subtract_square_state import SubtractSquareState
+        >>> path = os.path.join(tempfile.mkdtemp(), 'scores')
+        >>> s = StrategyMinimaxPersistent(path=path)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21)))
+        Remove 16
+        >>> s.close()
+        >>> s = StrategyMinimaxPersistent(path=path)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21)))
+        Remove 16
+        >>> s.nodes
+        4
+        >>> s.close()
+        '''
+
+        move = StrategyMinimaxMemoize.suggest_move(self, state)
+        self.flush()
+        return move
+
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPersistent, GameState, int, float, float)
+            -> float
+
+        Return minimax of state, and write the new scores to the database
+        Override StrategyMinimaxMemoize.evaluate
+        '''
+
+        score = self.minimax(state)
+        self.flush()
+        return score
+
+    def flush(self):
+        ''' (StrategyMinimaxPersistent) -> NoneType
+
+        Write the scores not written yet to the database.
+        '''
+
+        for table in self.tables.values():
+            table.flush()
+
+    def close(self):
+        ''' (StrategyMinimaxPersistent) -> NoneType
+
+        Write the scores not written yet, and close the database.
+        '''
+
+        for table in self.tables.values():
+            table.close()
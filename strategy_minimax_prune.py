@@ -1,4 +1,5 @@
 from strategy import Strategy
+from move_ordering import MoveOrdering
 
 
 class StrategyMinimaxPrune(Strategy):
@@ -6,8 +7,29 @@ class StrategyMinimaxPrune(Strategy):
     
     Uses pruning minimax algorithm that only expands the game tree as far
     as needed to find the best move
+    
+    ordering: MoveOrdering  -- decides the order in which moves are tried;
+                               MoveOrdering(killers=False) keeps the order
+                               of possible_next_moves
+    nodes: int        -- states searched during the last suggest_move
+    cutoffs: int      -- searches of a state's moves that stopped early
+                         during the last suggest_move
+    cutoff_moves: int -- moves tried by those searches, in all, so that
+                         cutoff_moves / cutoffs is 1 for perfect ordering
     '''
     
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 ordering=None):
+        ''' (StrategyMinimaxPrune, bool, bool, bool, MoveOrdering) -> None
+        
+        Initialize a minimax prune strategy, trying moves in the order
+        ordering decides, or with killer moves first if it is not given
+        '''
+        
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.ordering = MoveOrdering() if ordering is None else ordering
+        self.nodes = self.cutoffs = self.cutoff_moves = 0
+    
     def suggest_move(self, state):
         ''' (StrategyMinimax, GameState) -> Move 
         
@@ -15,11 +37,11 @@ class StrategyMinimaxPrune(Strategy):
         Override Strategy.suggest_move
         '''
         
+        self.nodes = self.cutoffs = self.cutoff_moves = 0
         move = None
         
         for i in state.possible_next_moves():  # iterate through options
-            x = state.apply_move(i)
-            score = self.minimax(x, state.LOSE, state.WIN, False)
+            score = self.score(state, i, state.LOSE, state.WIN, False)
             
             if score == state.WIN:
             # if winning move is available, stop searching
@@ -31,8 +53,18 @@ class StrategyMinimaxPrune(Strategy):
         # if all moves are losses, return first available move
         return move if move else state.possible_next_moves()[0]
     
-    def minimax(self, state, cur_min=-1, opp_min=1, cur=True):
-        ''' (StrategyMinimaxPrune, GameState, int, int, bool) -> float
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPrune, GameState, int, float, float) -> float
+        
+        Return minimax of state for its next_player, with the given
+        cur_min, opp_min and ply
+        Override Strategy.evaluate
+        '''
+        
+        return self.minimax(state, cur_min, opp_min, True, ply)
+    
+    def minimax(self, state, cur_min=-1, opp_min=1, cur=True, ply=1):
+        ''' (StrategyMinimaxPrune, GameState, int, int, bool, int) -> float
         
         Return score for the given game state, that is, how favourable the 
         game is for the next_player
@@ -45,31 +77,91 @@ class StrategyMinimaxPrune(Strategy):
         opp_min: int  -- worst guaranteed score for opponent (minimizer)
         
         cur: bool  -- whether the options are for next_player or opponent
+        ply: int   -- number of moves made since the state suggest_move
+                      was given
         '''
         
+        self.nodes += 1
         if state.over:  # if over, return outcome for next_player
             return state.outcome() if cur else (-1) * state.outcome()
-        elif cur:  # options for next_player
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search
+            score = state.solved_outcome()
+            return score if cur else (-1) * score
+        
+        moves = self.ordering.order(state, state.possible_next_moves(), ply)
+        if cur:  # options for next_player
             score = -1  # begin at worst achievable score
-            for i in state.possible_next_moves():
+            for n, i in enumerate(moves):
                 # iterate through moves, reset cur_min and score
-                x = state.apply_move(i)
-                score = max(score, self.minimax(x, cur_min, opp_min, False))
+                score = max(score, self.score(state, i, cur_min, opp_min,
+                                              False, ply + 1))
                 cur_min = max(score, cur_min)
                 
                 # if cur_min is better than opp_min, stop searching
                 if cur_min >= opp_min:
+                    self.cutoff(state, i, ply, n + 1)
                     break
             return score
         else:  # options for opponent
             score = 1  # begin at worst achievable score (for opp)
-            for i in state.possible_next_moves():
+            for n, i in enumerate(moves):
                 # iterate through moves, reset opp_min and score
-                x = state.apply_move(i)
-                score = min(score, self.minimax(x, cur_min, opp_min, True))
+                score = min(score, self.score(state, i, cur_min, opp_min,
+                                              True, ply + 1))
                 opp_min = min(score, opp_min)
                 
                 # if opp_min is worse than cur_min, stop searching
                 if opp_min <= cur_min:
+                    self.cutoff(state, i, ply, n + 1)
                     break 
-            return score
\ No newline at end of file
+            return score
+    
+    def cutoff(self, state, move, ply, tried):
+        ''' (StrategyMinimaxPrune, GameState, Move, int, int) -> NoneType
+        
+        Count a search of the moves of state, ply moves below the state
+        suggest_move was given, that stopped after tried moves because
+        move was good enough, and tell self.ordering
+        '''
+        
+        self.cutoffs += 1
+        self.cutoff_moves += tried
+        self.ordering.cutoff(state, move, ply)
+    
+    def stats(self):
+        ''' (StrategyMinimaxPrune) -> dict
+        
+        Return the counters of the last suggest_move, and the average
+        number of moves tried before a cutoff
+        
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxPrune(ordering=MoveOrdering())
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=9)))
+        Remove 9
+        >>> s.stats()['nodes']
+        1
+        '''
+        
+        return {'nodes': self.nodes, 'cutoffs': self.cutoffs,
+                'moves_per_cutoff': self.cutoff_moves / max(self.cutoffs, 1)}
+    
+    def score(self, state, move, cur_min, opp_min, cur, ply=1):
+        ''' (StrategyMinimaxPrune, GameState, Move, int, int, bool, int)
+            -> float
+        
+        Return minimax of the state reached by applying move to state,
+        with the given cur_min, opp_min, cur and ply
+        
+        If self.in_place, move is pushed onto state and popped off again,
+        so state is unchanged when this returns
+        '''
+        
+        if self.in_place:
+            state.push(move)
+            score = self.minimax(state, cur_min, opp_min, cur, ply)
+            state.pop()
+            return score
+        else:
+            return self.minimax(state.apply_move(move, True),
+                                cur_min, opp_min, cur, ply)
\ No newline at end of file
@@ -0,0 +1,97 @@
+from strategy_minimax_prune import StrategyMinimaxPrune
+
+
+class StrategyMinimaxPruneIterative(StrategyMinimaxPrune):
+    ''' Interface to suggest moves in a game
+
+    Gives the same results as StrategyMinimaxPrune, and searches the same
+    states, but minimax keeps its own stack of the states being searched
+    instead of calling itself, so the depth of a search is not bounded by
+    Python's recursion limit, and no Python frame is made for each state.
+    '''
+
+    def minimax(self, state, cur_min=-1, opp_min=1, cur=True, ply=1):
+        ''' (StrategyMinimaxPruneIterative, GameState, int, int, bool, int)
+            -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+
+        cur_min: int  -- worst guaranteed score for next_player (maximizer)
+        opp_min: int  -- worst guaranteed score for opponent (minimizer)
+
+        cur: bool  -- whether the options are for next_player or opponent
+        ply: int   -- number of moves made since the state suggest_move
+                      was given
+        Override StrategyMinimaxPrune.minimax
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxPruneIterative()
+        >>> s.minimax(SubtractSquareState('p1', current_total=21))
+        1
+        '''
+
+        in_place, order, nodes = self.in_place, self.ordering.order, 0
+        # each frame is [state, moves, index of the move being searched,
+        # score so far, cur_min, opp_min, cur, ply] for a state whose moves
+        # are being searched
+        stack = []
+        while True:
+            nodes += 1
+            if state.over:  # if over, the score is outcome for next_player
+                score = state.outcome() if cur else (-1) * state.outcome()
+            elif self.oracle and state.solved_outcome() is not None:
+                # if the game knows the outcome, there is no need to search
+                score = state.solved_outcome()
+                score = score if cur else (-1) * score
+            else:
+                # search the first of the moves, and come back for the rest;
+                # begin at worst achievable score for whoever has the move
+                moves = order(state, state.possible_next_moves(), ply)
+                stack.append([state, moves, 0, -1 if cur else 1,
+                              cur_min, opp_min, cur, ply])
+                if in_place:
+                    state.push(moves[0])
+                else:
+                    state = state.apply_move(moves[0], True)
+                cur, ply = not cur, ply + 1
+                continue
+
+            # hand score up to the states above, until one of them has a
+            # move left to search
+            while stack:
+                frame = stack[-1]
+                state, moves, n = frame[0], frame[1], frame[2]
+                if in_place:
+                    state.pop()
+                if frame[6]:  # options for next_player
+                    if score > frame[3]:
+                        frame[3] = score
+                    if score > frame[4]:
+                        frame[4] = score
+                else:  # options for opponent
+                    if score < frame[3]:
+                        frame[3] = score
+                    if score < frame[5]:
+                        frame[5] = score
+                if frame[4] >= frame[5]:
+                    # cur_min is better than opp_min, stop searching
+                    self.cutoff(state, moves[n], frame[7], n + 1)
+                elif n + 1 < len(moves):
+                    n = frame[2] = n + 1
+                    if in_place:
+                        state.push(moves[n])
+                    else:
+                        state = state.apply_move(moves[n], True)
+                    cur_min, opp_min = frame[4], frame[5]
+                    cur, ply = not frame[6], frame[7] + 1
+                    break
+                stack.pop()
+                score = frame[3]
+            else:
+                self.nodes += nodes
+                return score
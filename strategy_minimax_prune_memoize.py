@@ -0,0 +1,193 @@
+from strategy_minimax_memoize import StrategyMinimaxMemoize
+from shared_transposition_table import SharedTranspositionTable
+
+# kinds of score stored in a table entry: the exact score of the state, or
+# only a bound on it, found when the search below the state was cut off
+EXACT, LOWER, UPPER = 0, 1, -1
+
+
+class StrategyMinimaxPruneMemoize(StrategyMinimaxMemoize):
+    ''' Interface for suggesting moves
+
+    Uses pruning minimax algorithm that stores what it learns about
+    GameStates in a TranspositionTable. A search that was cut off only
+    bounds the score of its state, so each entry is a tuple
+    (score, kind, move), where kind is EXACT, LOWER (the score is at least
+    score) or UPPER (the score is at most score), and move is the best
+    move found, which is searched first when the state comes back. A
+    SharedTranspositionTable only holds floats, so there kind is stored
+    as the flag of the entry, and move is not stored.
+
+    DATA: dict  -- TranspositionTable shared by all instances for each
+                   GameState subclass, apart from those of
+                   StrategyMinimaxMemoize
+    '''
+
+    DATA = {}
+
+    def suggest_move(self, state):
+        ''' (StrategyMinimaxPruneMemoize, GameState) -> Move
+
+        Use minimax to return the move reaching the best score
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxPruneMemoize()
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21)))
+        Remove 16
+        '''
+
+        table, key = self.table_for(state), state.key()
+        moves = self.ordered_moves(state, self.lookup(table, key))
+        start = self.nodes
+        score, move = state.LOSE, moves[0]
+        for i in moves:
+            # only a better score than the best so far matters, so the
+            # search below i can stop as soon as it cannot be better
+            i_score = (-1) * self.score(state, i, -state.WIN, -score)
+            if i_score > score:
+                score, move = i_score, i
+            if score == state.WIN:
+                # if winning move is available, stop searching
+                break
+        self.remember(table, key, (score, EXACT, move), self.nodes - start + 1)
+        return move
+
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPruneMemoize, GameState, int, float, float)
+            -> float
+
+        Return minimax of state, with the given cur_min and opp_min
+        Override Strategy.evaluate
+        '''
+
+        return self.minimax(state, cur_min, opp_min)
+
+    def minimax(self, state, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPruneMemoize, GameState, float, float) -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+
+        cur_min: float  -- worst guaranteed score for next_player
+        opp_min: float  -- best score for next_player the opponent allows
+
+        If the score is at most cur_min, only a score between it and
+        cur_min is returned, and likewise if it is at least opp_min.
+        While game tree is traversed, store what is learned about
+        GameStates in the table from table_for
+
+        >>> from tippy_game_state import TippyGameState
+        >>> StrategyMinimaxPruneMemoize().minimax(TippyGameState('p1'))
+        1.0
+        '''
+
+        table, key = self.table_for(state), state.key()
+        entry = self.lookup(table, key)
+        self.nodes += 1
+        if entry is not None:
+            score, kind, move = entry
+            if kind == EXACT or (kind == LOWER and score >= opp_min) or \
+                    (kind == UPPER and score <= cur_min):
+                # if the stored score decides this search, return it
+                return score
+        elif state.over:
+            # if game is over, return outcome, assign value to table
+            self.remember(table, key, (state.outcome(), EXACT, None), 1)
+            return state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            # if the game knows the outcome, assign it to table
+            self.remember(table, key, (state.solved_outcome(), EXACT, None),
+                          1)
+            return state.solved_outcome()
+
+        start, first_min = self.nodes, cur_min
+        score, move = state.LOSE, None
+        for i in self.ordered_moves(state, entry):
+            # find opponent's score, multiplied by (-1) since minimax
+            # returns opponent's score, with the bounds swapped likewise
+            i_score = (-1) * self.score(state, i, -opp_min, -cur_min)
+            if move is None or i_score > score:
+                score, move = i_score, i
+            cur_min = max(score, cur_min)
+
+            # if cur_min is better than opp_min, stop searching
+            if cur_min >= opp_min:
+                break
+
+        if score <= first_min:
+            kind = UPPER
+        elif score >= opp_min:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.remember(table, key, (score, kind, move), self.nodes - start + 1)
+        return score
+
+    def lookup(self, table, key):
+        ''' (StrategyMinimaxPruneMemoize, TranspositionTable, hashable)
+            -> tuple
+
+        Return the entry (score, kind, move) stored for key in table, or
+        None if there is none
+
+        >>> t = SharedTranspositionTable(4)
+        >>> s = StrategyMinimaxPruneMemoize(table=t)
+        >>> s.remember(t, 7, (0.0, LOWER, 'move'), 3)
+        >>> s.lookup(t, 7)
+        (0.0, 1, None)
+        >>> t.unlink()
+        '''
+
+        if isinstance(table, SharedTranspositionTable):
+            entry = table.probe(key)
+            return None if entry is None else (entry[0], entry[2], None)
+        return table.get(key)
+
+    def remember(self, table, key, entry, depth):
+        ''' (StrategyMinimaxPruneMemoize, TranspositionTable, hashable,
+             tuple, int) -> NoneType
+
+        Store entry (score, kind, move) for key in table, found by a search
+        of depth nodes
+        '''
+
+        if isinstance(table, SharedTranspositionTable):
+            table.store(key, entry[0], depth, entry[1])
+        else:
+            table.store(key, entry, depth)
+
+    def ordered_moves(self, state, entry):
+        ''' (StrategyMinimaxPruneMemoize, GameState, tuple) -> list of Move
+
+        Return the possible_next_moves of state, with the best move of
+        entry, the table entry for state if there is one, first
+        '''
+
+        moves = state.possible_next_moves()
+        if entry is None or entry[2] is None or entry[2] not in moves:
+            return moves
+        return [entry[2]] + [i for i in moves if i != entry[2]]
+
+    def score(self, state, move, cur_min, opp_min):
+        ''' (StrategyMinimaxPruneMemoize, GameState, Move, float, float)
+            -> float
+
+        Return minimax of the state reached by applying move to state,
+        with the given cur_min and opp_min
+
+        If self.in_place, move is pushed onto state and popped off again,
+        so state is unchanged when this returns
+        '''
+
+        if self.in_place:
+            state.push(move)
+            score = self.minimax(state, cur_min, opp_min)
+            state.pop()
+            return score
+        else:
+            return self.minimax(state.apply_move(move, True), cur_min, opp_min)
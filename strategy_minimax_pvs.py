@@ -0,0 +1,155 @@
+from strategy import Strategy
+from move_ordering import MoveOrdering
+
+
+class StrategyMinimaxPVS(Strategy):
+    ''' Interface for suggesting moves
+
+    Uses principal variation search (NegaScout): the first move of each
+    state is searched with the full window of scores that still matter,
+    and every other move only with a null window, which just tells
+    whether it is better than the best so far. Only a move that is better
+    is searched again with the full window, to find its score. With good
+    move ordering the first move is usually best, and null window
+    searches prune much more. The window carries over from one move of
+    the state suggest_move is given to the next, so searches of worse
+    moves there are cut off too.
+
+    ordering: MoveOrdering  -- decides the order in which moves are tried
+    nodes: int              -- states searched during the last
+                               suggest_move
+    researches: int         -- null window searches during the last
+                               suggest_move that had to be repeated
+    '''
+
+    # width of a null window: smaller than the difference between any two
+    # scores that are not equal
+    NULL = 1e-9
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 ordering=None):
+        ''' (StrategyMinimaxPVS, bool, bool, bool, MoveOrdering) -> None
+
+        Initialize a principal variation search strategy, trying moves in
+        the order ordering decides, or with killer moves first if it is
+        not given
+        '''
+
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.ordering = MoveOrdering() if ordering is None else ordering
+        self.nodes = self.researches = 0
+
+    def suggest_move(self, state):
+        ''' (StrategyMinimaxPVS, GameState) -> Move
+
+        Use principal variation search to return the move reaching the
+        best score
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyMinimaxPVS()
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21)))
+        Remove 16
+        >>> s = StrategyMinimaxPVS(oracle=True)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=28)))
+        Remove 16
+        '''
+
+        self.nodes = self.researches = 0
+        return self.search(state, state.LOSE, state.WIN, 0)[1]
+
+    def minimax(self, state, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPVS, GameState, float, float) -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+
+        cur_min: float  -- worst guaranteed score for next_player
+        opp_min: float  -- best score for next_player the opponent allows
+
+        If the score is at most cur_min, only a score between it and
+        cur_min is returned, and likewise if it is at least opp_min.
+
+        >>> from tippy_game_state import TippyGameState
+        >>> StrategyMinimaxPVS().minimax(TippyGameState('p1'))
+        1.0
+        '''
+
+        return self.search(state, cur_min, opp_min, 0)[0]
+
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyMinimaxPVS, GameState, int, float, float) -> float
+
+        Return minimax of state, with the given cur_min, opp_min and ply
+        Override Strategy.evaluate
+        '''
+
+        return self.search(state, cur_min, opp_min, ply)[0]
+
+    def search(self, state, cur_min, opp_min, ply):
+        ''' (StrategyMinimaxPVS, GameState, float, float, int)
+            -> (float, Move)
+
+        Return minimax of state, with the given cur_min and opp_min, and
+        the best move found, or None if state is over. ply is the number
+        of moves made since the state suggest_move was given.
+        '''
+
+        self.nodes += 1
+        if state.over:  # if over, return outcome for next_player
+            return state.outcome(), None
+        elif self.oracle and ply > 0 and state.solved_outcome() is not None:
+            # if the game knows the outcome, there is no need to search,
+            # except at ply 0, where a move is wanted too
+            return state.solved_outcome(), None
+
+        score, move = state.LOSE, None
+        moves = self.ordering.order(state, state.possible_next_moves(), ply)
+        for i in moves:
+            if move is None:
+                # search the first move with the full window
+                i_score = (-1) * self.score(state, i, -opp_min, -cur_min,
+                                            ply + 1)
+            else:
+                # only find out whether i is better than cur_min
+                i_score = (-1) * self.score(
+                    state, i, -cur_min - StrategyMinimaxPVS.NULL, -cur_min,
+                    ply + 1)
+                if cur_min < i_score < opp_min:
+                    # it is, so search it again to find its score
+                    self.researches += 1
+                    i_score = (-1) * self.score(state, i, -opp_min,
+                                                -cur_min, ply + 1)
+            if move is None or i_score > score:
+                score, move = i_score, i
+            cur_min = max(score, cur_min)
+
+            # if cur_min is better than opp_min, stop searching
+            if cur_min >= opp_min:
+                self.ordering.cutoff(state, i, ply)
+                break
+        return score, move
+
+    def score(self, state, move, cur_min, opp_min, ply):
+        ''' (StrategyMinimaxPVS, GameState, Move, float, float, int)
+            -> float
+
+        Return minimax of the state reached by applying move to state,
+        with the given cur_min, opp_min and ply
+
+        If self.in_place, move is pushed onto state and popped off again,
+        so state is unchanged when this returns
+        '''
+
+        if self.in_place:
+            state.push(move)
+            score = self.search(state, cur_min, opp_min, ply)[0]
+            state.pop()
+            return score
+        else:
+            return self.search(state.apply_move(move, True), cur_min,
+                               opp_min, ply)[0]
@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Value
+from strategy import Strategy
+from strategy_minimax_prune import StrategyMinimaxPrune
+
+# the strategy each worker process searches with, the best score for the
+# player to move at the root found so far, and the number of the last
+# suggest_move that is over, shared by all processes; all are set up by
+# start_worker when a process starts
+ENGINE = None
+BOUND = None
+DONE = None
+
+# the number of the suggest_move whose line this worker is searching, or
+# None, and the seconds between looks at DONE
+RUNNING = None
+WATCH_EVERY = 0.01
+
+
+def start_worker(engine, in_place, oracle, bound, done, table=None):
+    ''' (type, bool, bool, Value, Value, SharedTranspositionTable)
+        -> NoneType
+
+    Set up a worker process of a StrategyParallel to search with a new
+    engine, and to share bound and done with the others. If table is
+    given, the engine stores its scores there, where every worker can find
+    them.
+    '''
+
+    global ENGINE, BOUND, DONE
+    if table is None:
+        ENGINE = engine(in_place=in_place, oracle=oracle)
+    else:
+        ENGINE = engine(in_place=in_place, oracle=oracle, table=table)
+    BOUND, DONE = bound, done
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def watch():
+    ''' () -> NoneType
+
+    Stop the search of ENGINE once the suggest_move it is searching for
+    is over. This is what a thread of each worker process runs.
+    '''
+
+    while True:
+        time.sleep(WATCH_EVERY)
+        call = RUNNING
+        if call is not None and DONE.value >= call:
+            ENGINE.stop(call)
+
+
+def evaluate_line(state, moves, call):
+    ''' (GameState, tuple of Move, int) -> float
+
+    Return the score, for the next_player of state, of the state reached
+    by applying moves to state, for suggest_move number call. A score at
+    most the best score found when the search started may only be a bound
+    on the score. Return None without searching if that suggest_move is
+    over already.
+    '''
+
+    global RUNNING
+    if DONE.value >= call:
+        return None
+    for i in moves:
+        state = state.apply_move(i, True)
+    best = BOUND.value
+    with ENGINE.lock:
+        ENGINE.begin_search(call)
+        RUNNING = call
+        try:
+            if len(moves) % 2 == 0:
+                return ENGINE.evaluate(state, len(moves), best, state.WIN)
+            else:
+                return (-1) * ENGINE.evaluate(state, len(moves),
+                                              -state.WIN, -best)
+        finally:
+            RUNNING = None
+            ENGINE.end_search()
+
+
+class StrategyParallel(Strategy):
+    ''' Interface for suggesting moves
+
+    Splits the search of another strategy, the engine, across a pool of
+    worker processes: each move from the state suggest_move is given, or
+    with plies=2 each pair of moves, is searched by a worker of its own,
+    through the engine's evaluate. The best score found so far for the
+    player to move is shared between the workers, so that engines which
+    prune can cut off every search that cannot beat it. With plies=2, the
+    searches of the replies to a move are cancelled as soon as one of
+    them shows that the move cannot beat the best so far.
+
+    suggest_move returns as soon as the best move is known, and the
+    searches it still has running are then asked to stop. Engines that
+    look at Strategy.stopped, like StrategyMinimaxDeepening, stop at once;
+    others finish the search they are running, but start none of that
+    suggest_move's searches that are still waiting.
+
+    An engine whose SHARED_TABLE is True, which StrategyMinimaxMemoize
+    and its subclasses such as StrategyMinimaxPruneMemoize are, can be
+    given a SharedTranspositionTable, so that a state one worker has
+    searched is not searched again by the others. Other engines, such as
+    StrategyMinimaxMTDF, store entries a shared table cannot hold.
+
+    engine: type    -- the Strategy subclass the workers search with
+    workers: int    -- number of worker processes
+    plies: int      -- 1 or 2, number of moves each worker is given
+    table: SharedTranspositionTable -- table shared by the engines of the
+                       workers, or None
+    scores: dict    -- exact score of each move whose score was found
+                       during the last suggest_move
+    calls: int      -- number of suggest_moves so far
+    '''
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 engine=StrategyMinimaxPrune, workers=None, plies=1,
+                 table=None):
+        ''' (StrategyParallel, bool, bool, bool, type, int, int,
+             SharedTranspositionTable) -> None
+
+        Initialize a parallel strategy searching with engine, given
+        in_place, oracle and table if it is not None, in workers
+        processes, or one per CPU if workers is None. Raise ValueError if
+        table is given but engine cannot search with it.
+
+        >>> from shared_transposition_table import SharedTranspositionTable
+        >>> t = SharedTranspositionTable(4)
+        >>> StrategyParallel(table=t)
+        Traceback (most recent call last):
+        ...
+        ValueError: StrategyMinimaxPrune cannot use a shared table
+        >>> t.unlink()
+        '''
+
+        if table is not None and not getattr(engine, 'SHARED_TABLE', False):
+            raise ValueError('{} cannot use a shared table'.format(
+                engine.__name__))
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.engine, self.plies, self.table = engine, plies, table
+        self.workers = os.cpu_count() if workers is None else workers
+        self.pool, self.bound, self.scores = None, None, {}
+        self.done, self.calls = None, 0
+
+    def suggest_move(self, state):
+        ''' (StrategyParallel, GameState) -> Move
+
+        Return the move reaching the best score, searching its moves in
+        parallel
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyParallel(workers=2, plies=2)
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=28)))
+        Remove 16
+        >>> s.close()
+        '''
+
+        if self.pool is None:
+            self.bound = Value('d', state.LOSE)
+            self.done = Value('q', self.calls)
+            self.pool = ProcessPoolExecutor(
+                self.workers, initializer=start_worker,
+                initargs=(self.engine, self.in_place, self.oracle,
+                          self.bound, self.done, self.table))
+        self.bound.value, self.scores = state.LOSE, {}
+        self.calls += 1
+        try:
+            return self.search(state)
+        finally:
+            # whatever is still searching for this call is of no use
+            self.done.value = self.calls
+
+    def search(self, state):
+        ''' (StrategyParallel, GameState) -> Move
+
+        Return the move reaching the best score, searching its moves in
+        the worker processes, without waiting for searches that no
+        longer matter
+        '''
+
+        # lines[move] holds the futures of the searches below move; the
+        # least score they find is the score of move
+        moves, lines, owner, least = state.possible_next_moves(), {}, {}, {}
+        for i in moves:
+            child = state.apply_move(i, True)
+            if self.plies == 1 or child.over:
+                replies = [(i,)]
+            else:
+                replies = [(i, j) for j in child.possible_next_moves()]
+            lines[i] = set()
+            for line in replies:
+                future = self.pool.submit(evaluate_line, state, line,
+                                          self.calls)
+                lines[i].add(future)
+                owner[future] = i
+            least[i] = state.WIN
+
+        for future in as_completed(owner):
+            i = owner[future]
+            if future.cancelled() or i not in lines:
+                continue
+            # a score that is only a bound is above the exact score, so
+            # the score of i is at most least[i] either way
+            lines[i].discard(future)
+            least[i] = min(least[i], future.result())
+            if least[i] <= self.bound.value:
+                # i cannot beat the best move so far
+                self.cancel(lines.pop(i))
+            elif not lines[i]:
+                # every search below i is done, so its score is exact
+                del lines[i]
+                self.scores[i] = least[i]
+                self.bound.value = max(self.bound.value, least[i])
+                if least[i] == state.WIN:
+                    # nothing beats a win
+                    for j in list(lines):
+                        self.cancel(lines.pop(j))
+            if not lines:
+                # every move is decided, so the searches still running
+                # cannot change the result
+                break
+
+        if not self.scores:
+            # every move loses, so any of them will do
+            return moves[0]
+        score = max(self.scores.values())
+        return [i for i in moves if self.scores.get(i) == score][0]
+
+    def cancel(self, futures):
+        ''' (StrategyParallel, set of Future) -> NoneType
+
+        Cancel those of futures that have not started yet.
+        '''
+
+        for future in futures:
+            future.cancel()
+
+    def close(self):
+        ''' (StrategyParallel) -> NoneType
+
+        Shut down the worker processes of self, if any.
+        '''
+
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,218 @@
+from strategy import Strategy
+from transposition_table import TranspositionTable
+
+
+class StrategyProofNumber(Strategy):
+    ''' Interface for suggesting moves
+
+    Uses depth-first proof-number search (df-pn) to solve the game: it
+    answers whether the next_player can reach at least a given outcome,
+    without the ordering of the search mattering as it does for minimax.
+    Each state has a proof number, the least number of states whose
+    outcome must be found to prove that the player to move reaches their
+    goal, and a disproof number, the least number to prove they do not.
+    The search always expands the most proving state: the one that would
+    lower the proof number of the state it started from the most. Proof
+    and disproof numbers of the states searched so far are kept in a
+    TranspositionTable, so the search can leave a subtree and come back.
+
+    A proof only answers yes or no, so solve first asks whether the
+    next_player wins and, if not, whether they at least draw.
+
+    table_size: int  -- most entries of the table each search uses
+    nodes: int       -- states expanded during the last solve
+    '''
+
+    # proof or disproof number of a state whose goal is disproved or
+    # proved: more than any sum of the numbers of states that are not
+    INF = 10 ** 9
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 table_size=2 ** 20):
+        ''' (StrategyProofNumber, bool, bool, bool, int) -> None
+
+        Initialize a proof-number search strategy, keeping at most
+        table_size entries in its transposition table
+        '''
+
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.table_size, self.nodes = table_size, 0
+        self.table, self.player, self.goal = None, None, None
+        self.move = None
+
+    def suggest_move(self, state):
+        ''' (StrategyProofNumber, GameState) -> Move
+
+        Return a move that reaches the best outcome with perfect play
+        Override Strategy.suggest_move
+        '''
+
+        return self.solve(state)[1]
+
+    def minimax(self, state):
+        ''' (StrategyProofNumber, GameState) -> float
+
+        Return score for the given game state, that is, how favourable the
+        game is for the next_player
+
+        If a winning strategy is available, return 1
+        Elif a tying strategy is available, return 0
+        Else return -1
+
+        >>> from tippy_game_state import TippyGameState
+        >>> StrategyProofNumber().minimax(TippyGameState('p1'))
+        1.0
+        '''
+
+        return self.solve(state)[0]
+
+    def solve(self, state):
+        ''' (StrategyProofNumber, GameState) -> (float, Move)
+
+        Return the outcome for the next_player of state with perfect play,
+        and a move that reaches it, or None if state is over.
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyProofNumber()
+        >>> state = SubtractSquareState('p1', current_total=21)
+        >>> outcome, move = s.solve(state)
+        >>> outcome, str(move)
+        (1.0, 'Remove 16')
+        >>> s.solve(SubtractSquareState('p1', current_total=22))[0]
+        -1.0
+        '''
+
+        self.nodes = 0
+        if state.over:
+            return state.outcome(), None
+        for goal in (state.WIN, state.DRAW):
+            move = self.prove(state, goal)
+            if move is not None:
+                return goal, move
+        # every move loses, so any of them will do
+        return state.LOSE, state.possible_next_moves()[0]
+
+    def prove(self, state, goal):
+        ''' (StrategyProofNumber, GameState, float) -> Move
+
+        Return a move from state that proves the next_player of state
+        reaches an outcome of at least goal, or None if they cannot.
+        '''
+
+        self.table = TranspositionTable(self.table_size)
+        self.player, self.goal = state.next_player, goal
+        self.search(state, StrategyProofNumber.INF, StrategyProofNumber.INF,
+                    True)
+        return self.move
+
+    def terminal(self, state):
+        ''' (StrategyProofNumber, GameState) -> (int, int)
+
+        Return the proof and disproof numbers of state if its outcome is
+        known without searching, or None.
+        '''
+
+        if state.over:
+            outcome = state.outcome()
+        elif self.oracle and state.solved_outcome() is not None:
+            outcome = state.solved_outcome()
+        else:
+            return None
+        # the searching player's goal is to reach goal, the opponent's is
+        # to keep them from it
+        if state.next_player == self.player:
+            proved = outcome >= self.goal
+        else:
+            proved = (-1) * outcome < self.goal
+        if proved:
+            return 0, StrategyProofNumber.INF
+        else:
+            return StrategyProofNumber.INF, 0
+
+    def numbers(self, state):
+        ''' (StrategyProofNumber, GameState) -> (int, int)
+
+        Return the proof and disproof numbers known for state, which are
+        both 1 for a state not yet searched.
+        '''
+
+        numbers = self.table.get(state.key())
+        if numbers is None:
+            numbers = self.terminal(state)
+            if numbers is None:
+                return 1, 1
+            self.table.store(state.key(), numbers)
+        return numbers
+
+    def search(self, state, proof_max, disproof_max, root=False):
+        ''' (StrategyProofNumber, GameState, int, int, bool) -> (int, int)
+
+        Search below state until its proof number reaches proof_max or its
+        disproof number reaches disproof_max, and return both. The numbers
+        are for the next_player of state. If state is proved, remember the
+        move that proves it as self.move. Unless root, a state whose
+        outcome is known is not searched.
+        '''
+
+        self.nodes += 1
+        numbers = None if root else self.terminal(state)
+        if numbers is not None:
+            self.table.store(state.key(), numbers)
+            return numbers
+        moves = state.possible_next_moves()
+        numbers, children = self.expand(state, moves)
+        while True:
+            # proving state takes disproving one of its moves, disproving
+            # it takes proving all of them
+            proof, disproof = StrategyProofNumber.INF, 0
+            best, second = None, StrategyProofNumber.INF
+            for n in range(len(moves)):
+                i_proof, i_disproof = numbers[n]
+                disproof += i_proof
+                if i_disproof < proof:
+                    best, second = n, proof
+                    best_proof, proof = i_proof, i_disproof
+                elif i_disproof < second:
+                    second = i_disproof
+            disproof = min(disproof, StrategyProofNumber.INF)
+            if proof >= proof_max or disproof >= disproof_max:
+                break
+            # search the most proving move until it stops being the most
+            # proving, or state reaches one of its limits; its numbers are
+            # kept here, since the table may not keep them
+            i_proof_max = min(disproof_max - disproof + best_proof,
+                              StrategyProofNumber.INF)
+            i_disproof_max = min(proof_max, second + 1)
+            if self.in_place:
+                state.push(moves[best])
+                numbers[best] = self.search(state, i_proof_max,
+                                            i_disproof_max)
+                state.pop()
+            else:
+                numbers[best] = self.search(children[best], i_proof_max,
+                                            i_disproof_max)
+        self.table.store(state.key(), (proof, disproof))
+        # a move proves state if it disproves the opponent's goal
+        self.move = moves[best] if proof == 0 else None
+        return proof, disproof
+
+    def expand(self, state, moves):
+        ''' (StrategyProofNumber, GameState, list of Move)
+            -> (list of (int, int), list of GameState)
+
+        Return the numbers of the states reached by applying each of moves
+        to state, and those states. If self.in_place, the states are not
+        kept, and None is returned for them, since each move is pushed
+        onto state and popped off again.
+        '''
+
+        if self.in_place:
+            numbers = []
+            for i in moves:
+                state.push(i)
+                numbers.append(self.numbers(state))
+                state.pop()
+            return numbers, None
+        else:
+            children = [state.apply_move(i, True) for i in moves]
+            return [self.numbers(i) for i in children], children
@@ -0,0 +1,105 @@
+import os
+import tempfile
+from strategy import Strategy
+from tablebase import Tablebase, build_tablebase, game_tag
+
+
+class StrategyTablebase(Strategy):
+    ''' Interface for suggesting moves
+
+    Looks up the outcome of every move in a Tablebase, and suggests one
+    reaching the best of them. If the state it is given is not in the
+    tablebase, every state reachable from it is solved by retrograde
+    analysis first, into a tablebase file at path, or a temporary file
+    if path is None. Solving takes time and memory in proportion to the
+    number of reachable states, so it suits small games like Tippy on a
+    3 x 3 or nearly full 4 x 4 board.
+
+    tablebase: Tablebase  -- the tablebase looked up, or None before the
+                             first one is built
+    path: str             -- file to build a tablebase in
+    temporary: str        -- temporary file of self.tablebase, removed by
+                             close, or None
+    '''
+
+    def __init__(self, interactive=False, in_place=False, oracle=False,
+                 tablebase=None, path=None):
+        ''' (StrategyTablebase, bool, bool, bool, Tablebase, str) -> None
+
+        Initialize a tablebase strategy, looking up tablebase if it is
+        given, and building any tablebase it needs at path
+        '''
+
+        Strategy.__init__(self, interactive, in_place, oracle)
+        self.tablebase, self.path = tablebase, path
+        self.temporary = None
+
+    def suggest_move(self, state):
+        ''' (StrategyTablebase, GameState) -> Move
+
+        Return a move that reaches the best outcome with perfect play
+        Override Strategy.suggest_move
+
+        >>> from subtract_square_state import SubtractSquareState
+        >>> s = StrategyTablebase()
+        >>> print(s.suggest_move(SubtractSquareState('p1', current_total=21)))
+        Remove 16
+        >>> s.close()
+        '''
+
+        if self.tablebase is None or state not in self.tablebase:
+            self.build(state)
+        # every state reachable from state is in the tablebase now
+        moves = state.possible_next_moves()
+        if self.in_place:
+            scores = []
+            for i in moves:
+                state.push(i)
+                scores.append((-1) * self.tablebase.outcome(state))
+                state.pop()
+        else:
+            scores = [(-1) * self.tablebase.outcome(
+                state.apply_move(i, True)) for i in moves]
+        return moves[scores.index(max(scores))]
+
+    def evaluate(self, state, ply=1, cur_min=-1, opp_min=1):
+        ''' (StrategyTablebase, GameState, int, float, float) -> float
+
+        Return the outcome next_player gets from state with perfect play,
+        building a tablebase from state if it is not in self.tablebase
+        Override Strategy.evaluate
+        '''
+
+        if self.tablebase is None or state not in self.tablebase:
+            self.build(state)
+        return self.tablebase.outcome(state)
+
+    def build(self, state):
+        ''' (StrategyTablebase, GameState) -> NoneType
+
+        Replace self.tablebase by a tablebase of every state reachable
+        from state, in self.path or a new temporary file.
+        '''
+
+        self.close()
+        path = self.path
+        if path is None:
+            handle, path = tempfile.mkstemp(prefix='tablebase')
+            os.close(handle)
+            self.temporary = path
+        build_tablebase(state, path)
+        self.tablebase = Tablebase(path, game_tag(state))
+
+    def close(self):
+        ''' (StrategyTablebase) -> NoneType
+
+        Close self.tablebase, if any, and remove its file if it was
+        temporary.
+        '''
+
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+        if self.temporary is not None:
+            os.remove(self.temporary)
+            self.temporary = None
@@ -1,20 +1,73 @@
+from math import isqrt
 from move import Move
 
 
 class SubtractSquareMove(Move):
     ''' A move in the game of Subtract Square.
 
-    amount: int -- amount to subtract from current value.
+    SubtractSquareMoves are immutable, and there is only ever one
+    SubtractSquareMove for each square amount, so they can be used as
+    dict keys and compared by identity. Other amounts, which a user may
+    enter but which are never legal, get a new SubtractSquareMove each
+    time, as do squares once MOVES holds MAX_MOVES moves, so that MOVES
+    does not grow without bound.
+
+    amount: int    -- amount to subtract from current value.
+    MOVES: dict    -- the shared SubtractSquareMove for each square amount
+    MAX_MOVES: int -- most moves kept in MOVES
     '''
 
-    def __init__(self, amount):
-        ''' (SubtractSquareMove, int) -> NoneType
+    __slots__ = ('amount',)
+
+    MOVES = {}
+    MAX_MOVES = 2 ** 16
 
-        Initialize a new SubtractSquareMove for removing amount from value.
+    def __new__(cls, amount):
+        ''' (type, int) -> SubtractSquareMove
 
-        Assume: amount is a positive integer square.
+        Return the SubtractSquareMove for removing amount from value,
+        creating it the first time that amount is asked for if amount is
+        a positive square.
+
+        >>> SubtractSquareMove(4) is SubtractSquareMove(4)
+        True
+        >>> SubtractSquareMove(3) is SubtractSquareMove(3)
+        False
         '''
-        self.amount = amount
+        move = SubtractSquareMove.MOVES.get(amount)
+        if move is None:
+            move = Move.__new__(cls)
+            object.__setattr__(move, 'amount', amount)
+            if isinstance(amount, int) and amount > 0 and \
+                    isqrt(amount) ** 2 == amount and \
+                    len(SubtractSquareMove.MOVES) < \
+                    SubtractSquareMove.MAX_MOVES:
+                SubtractSquareMove.MOVES[amount] = move
+        return move
+
+    def __setattr__(self, name, value):
+        ''' (SubtractSquareMove, str, object) -> NoneType
+
+        Refuse to change this SubtractSquareMove, since it is shared.
+
+        >>> SubtractSquareMove(4).amount = 9
+        Traceback (most recent call last):
+        AttributeError: SubtractSquareMove is immutable
+        '''
+        raise AttributeError('SubtractSquareMove is immutable')
+
+    def __reduce__(self):
+        ''' (SubtractSquareMove) -> tuple
+
+        Return how to rebuild this SubtractSquareMove, so that copying or
+        unpickling it gives back the shared SubtractSquareMove.
+
+        >>> import pickle
+        >>> m = SubtractSquareMove(9)
+        >>> pickle.loads(pickle.dumps(m)) is m
+        True
+        '''
+        return (SubtractSquareMove, (self.amount,))
 
     def __repr__(self):
         ''' (SubtractSquareMove) -> str
@@ -49,8 +102,19 @@ class SubtractSquareMove(Move):
         >>> print(m1 == m2)
         False
         '''
-        return (isinstance(other, SubtractSquareMove) and 
-                self.amount == other.amount)
+        return self is other or (isinstance(other, SubtractSquareMove) and
+                                 self.amount == other.amount)
+
+    def __hash__(self):
+        ''' (SubtractSquareMove) -> int
+
+        Return a hash value for this SubtractSquareMove, consistent with
+        __eq__.
+
+        >>> hash(SubtractSquareMove(4)) == hash(SubtractSquareMove(4))
+        True
+        '''
+        return hash(self.amount)
 
 
 if __name__ == '__main__':
@@ -1,7 +1,8 @@
 from game_state import GameState
 from subtract_square_move import SubtractSquareMove
-from math import sqrt
+from math import isqrt
 from random import randint
+import subtract_square_table
 
 
 class SubtractSquareState(GameState):
@@ -10,6 +11,12 @@ class SubtractSquareState(GameState):
     current_total: int   --- total to be subtracted from
     '''
 
+    __slots__ = ('current_total',)
+
+    instructions = ('On your turn, you may remove any number so long '
+                    'as it is (a) a perfect square, and '
+                    '(b) no more than the current number.')
+
     def __init__(self, p, interactive=False, current_total=0):
         ''' (SubtractSquareState, int, str) -> NoneType
 
@@ -24,9 +31,6 @@ class SubtractSquareState(GameState):
         GameState.__init__(self, p)
         self.current_total = current_total
         self.over = (current_total < 1)
-        self.instructions = ('On your turn, you may remove any number so long '
-                             'as it is (a) a perfect square, and '
-                             '(b) no more than the current number.')
 
     def __repr__(self):
         ''' (SubtractSquareState) -> str
@@ -67,28 +71,116 @@ class SubtractSquareState(GameState):
                 self.current_total == other.current_total and
                 self.next_player == other.next_player)
 
-    def apply_move(self, move):
-        ''' (SubtractSquareState, SubtractSquareMove) -> SubtractSquareState
+    def __hash__(self):
+        ''' (SubtractSquareState) -> int
 
-        Return the new SubtractSquareState reached by applying move to self.
+        Return a hash value for SubtractSquareState self, consistent with
+        __eq__.
+
+        >>> s1 = SubtractSquareState('p1', current_total=17)
+        >>> s2 = SubtractSquareState('p1', current_total=17)
+        >>> hash(s1) == hash(s2)
+        True
+        '''
+        return hash(self.key())
+
+    def key(self):
+        ''' (SubtractSquareState) -> int
+
+        Return current_total and next_player packed into one int.
+
+        >>> SubtractSquareState('p1', current_total=17).key()
+        34
+        >>> SubtractSquareState('p2', current_total=17).key()
+        35
+        '''
+        return self.current_total * 2 + (self.next_player == 'p2')
+
+    def apply_move(self, move, trusted=False):
+        ''' (SubtractSquareState, SubtractSquareMove, bool)
+            -> SubtractSquareState
+
+        Return the new SubtractSquareState reached by applying move to self,
+        or None if move is illegal. If trusted, skip checking that move is
+        legal.
 
         >>> s1 = SubtractSquareState('p1', current_total=17)
         >>> s2 = s1.apply_move(SubtractSquareMove(9))
         >>> print(s2)
         Current total: 8; next player: p2
+        >>> s1.apply_move(SubtractSquareMove(25)) is None
+        True
         '''
-        if move in self.possible_next_moves():
+        if trusted or move in self.possible_next_moves():
             new_total = self.current_total - move.amount
             return SubtractSquareState(self.opponent(),
                                        current_total=new_total)
         else:
             return None
 
+    def push(self, move):
+        ''' (SubtractSquareState, SubtractSquareMove) -> NoneType
+
+        Apply legal move to self in place.
+
+        >>> s = SubtractSquareState('p1', current_total=17)
+        >>> s.push(SubtractSquareMove(16))
+        >>> print(s)
+        Current total: 1; next player: p2
+        '''
+        if self.undo is None:
+            self.undo = []
+        self.undo.append(move)
+        self.clear_cache()
+        self.current_total -= move.amount
+        self.next_player = self.opponent()
+        self.over = (self.current_total < 1)
+
+    def pop(self):
+        ''' (SubtractSquareState) -> SubtractSquareMove
+
+        Take back the move most recently pushed onto self, and return it.
+
+        >>> s = SubtractSquareState('p1', current_total=17)
+        >>> s.push(SubtractSquareMove(16))
+        >>> s.push(SubtractSquareMove(1))
+        >>> s.pop()
+        SubtractSquareMove(1)
+        >>> print(s)
+        Current total: 1; next player: p2
+        '''
+        move = self.undo.pop()
+        self.clear_cache()
+        self.current_total += move.amount
+        self.next_player = self.opponent()
+        self.over = False
+        return move
+
+    def solved_outcome(self):
+        '''(SubtractSquareState) -> float
+
+        Return the exact outcome for next_player from subtract_square_table,
+        or None if current_total is beyond subtract_square_table.LIMIT.
+        Subtract Square has no draws.
+
+        >>> SubtractSquareState('p1', current_total=7).solved_outcome()
+        -1.0
+        >>> SubtractSquareState('p1', current_total=8).solved_outcome()
+        1.0
+        '''
+        if self.current_total > subtract_square_table.LIMIT:
+            return None
+        elif subtract_square_table.is_winning(self.current_total):
+            return SubtractSquareState.WIN
+        else:
+            return SubtractSquareState.LOSE
+
     def rough_outcome(self):
         '''(SubtractSquareState) -> float
 
         Return an estimate in interval [LOSE, WIN] of best outcome next_player
-        can guarantee from state self.
+        can guarantee from state self. This is the exact outcome whenever
+        solved_outcome knows it.
 
         >>> SubtractSquareState('p1', current_total=0).rough_outcome()
         -1.0
@@ -99,14 +191,18 @@ class SubtractSquareState(GameState):
         >>> SubtractSquareState('p1', current_total=16).rough_outcome()
         1.0
         '''
-        if is_pos_square(self.current_total):
-            return SubtractSquareState.WIN
-        elif all([is_pos_square(self.current_total - n**2)
-                  for n in range(1, self.current_total + 1)
-                  if n**2 < self.current_total]):
-            return SubtractSquareState.LOSE
-        else:
-            return SubtractSquareState.DRAW
+        if self._rough is None:
+            self._rough = self.solved_outcome()
+        if self._rough is None:
+            if is_pos_square(self.current_total):
+                self._rough = SubtractSquareState.WIN
+            elif all([is_pos_square(self.current_total - n*n)
+                      for n in range(1, isqrt(max(self.current_total - 1,
+                                                  0)) + 1)]):
+                self._rough = SubtractSquareState.LOSE
+            else:
+                self._rough = SubtractSquareState.DRAW
+        return self._rough
 
     def get_move(self):
         '''(SubtractSquareState) -> SubtractSquareMove
@@ -136,17 +232,23 @@ class SubtractSquareState(GameState):
         ''' (SubtractSquareState) -> list of SubtractSquareMove
 
         Return a (possibly empty) list of moves that are legal
-        from the present state.
+        from the present state, largest first. The list is computed once
+        and then cached, so it must not be modified.
 
         >>> s1 = SubtractSquareState('p1', current_total=17)
         >>> L1 = s1.possible_next_moves()
         >>> L2 = [SubtractSquareMove(1), SubtractSquareMove(4), SubtractSquareMove(9), SubtractSquareMove(16)]
         >>> len(L1) == len(L2) and all([m in L2 for m in L1])
         True
+        >>> s2 = SubtractSquareState('p1', current_total=10**10 - 1)
+        >>> s2.possible_next_moves()[0]
+        SubtractSquareMove(9999800001)
         '''
-        return [SubtractSquareMove(i**2)
-                for i in range(self.current_total, 0, -1)
-                if i*i <= self.current_total]
+        if self._moves is None:
+            # only the isqrt(current_total) largest squares fit
+            root = isqrt(max(self.current_total, 0))
+            self._moves = square_moves(root)[root:0:-1]
+        return self._moves
 
 
 def is_pos_square(n):
@@ -158,9 +260,30 @@ def is_pos_square(n):
     False
     >>> is_pos_square(9)
     True
+    >>> is_pos_square((2**60 + 1)**2), is_pos_square((2**60 + 1)**2 + 1)
+    (True, False)
+    '''
+    return n > 0 and isqrt(n)**2 == n
+
+
+# SQUARE_MOVES[i] is SubtractSquareMove(i * i), for every i from 1 to the
+# largest root asked for so far; the list is shared by every state
+SQUARE_MOVES = [None]
+
+
+def square_moves(root):
+    '''(int) -> list of SubtractSquareMove
+
+    Return the shared table of square moves, first extending it if needed
+    so that it includes SubtractSquareMove(root * root).
+
+    >>> square_moves(3)[1:4]
+    [SubtractSquareMove(1), SubtractSquareMove(4), SubtractSquareMove(9)]
     '''
-    from math import sqrt
-    return round(sqrt(n))**2 == n and n > 0
+    if len(SQUARE_MOVES) <= root:
+        SQUARE_MOVES.extend([SubtractSquareMove(i * i)
+                             for i in range(len(SQUARE_MOVES), root + 1)])
+    return SQUARE_MOVES
 
 
 if __name__ == '__main__':
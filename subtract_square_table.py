@@ -0,0 +1,126 @@
+''' Exact win/loss table for Subtract Square.
+
+Subtract Square is solved: whoever is to move from a total n wins exactly
+when some square k*k <= n leads to a total the opponent loses from. The
+table is built bottom-up in one pass: every total not yet known to be a
+win is a loss, and each loss n makes n + k*k a win for every k.
+
+TABLE: bytearray  -- TABLE[n] is 1 if the player to move from total n wins,
+                     0 if they lose, for every n the table covers so far
+LOSSES: list      -- every losing total the table covers, in order
+'''
+from math import isqrt
+
+TABLE = bytearray(1)
+LOSSES = [0]
+
+# largest total the table will be extended to on request, about the
+# number of bytes it then takes
+LIMIT = 10**7
+
+# first bytes of a saved table, so that other files are not loaded by
+# mistake
+MAGIC = b'SUBSQ1\n'
+
+
+def extend_table(n):
+    ''' (int) -> NoneType
+
+    Extend TABLE, if needed, so that it covers every total up to n. The
+    table at least doubles each time it grows, so asking for totals one
+    at a time stays cheap.
+
+    >>> extend_table(10)
+    >>> len(TABLE) > 10
+    True
+    '''
+
+    old = len(TABLE)
+    if n < old:
+        return
+    new = max(n + 1, 2 * old)
+    TABLE.extend(bytes(new - old))
+    squares = [k * k for k in range(isqrt(new) + 1)]
+    # losses already found make some of the new totals wins
+    for p in LOSSES:
+        for s in squares[isqrt(max(old - p - 1, 0)) + 1:
+                         isqrt(new - 1 - p) + 1]:
+            TABLE[p + s] = 1
+    for p in range(old, new):
+        if not TABLE[p]:
+            # no move from p reaches a loss, so p is a loss
+            LOSSES.append(p)
+            for s in squares[1:isqrt(new - 1 - p) + 1]:
+                TABLE[p + s] = 1
+
+
+def is_winning(total):
+    ''' (int) -> bool
+
+    Return whether the player to move from total wins with perfect play.
+
+    >>> [n for n in range(20) if not is_winning(n)]
+    [0, 2, 5, 7, 10, 12, 15, 17]
+    '''
+
+    extend_table(total)
+    return TABLE[total] == 1
+
+
+def winning_move(total):
+    ''' (int) -> int
+
+    Return the largest square that leaves the opponent a losing total, or
+    0 if total is itself a losing total.
+
+    >>> winning_move(6), winning_move(7)
+    (4, 0)
+    '''
+
+    extend_table(total)
+    for k in range(isqrt(total), 0, -1):
+        if not TABLE[total - k * k]:
+            return k * k
+    return 0
+
+
+def save_table(path):
+    ''' (str) -> NoneType
+
+    Write TABLE to the file at path.
+    '''
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(TABLE)
+
+
+def load_table(path):
+    ''' (str) -> NoneType
+
+    Replace TABLE by the table saved in the file at path, unless the saved
+    table is smaller than the one already built.
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'table')
+    >>> extend_table(1000)
+    >>> save_table(path)
+    >>> TABLE[:] = bytearray(1)
+    >>> LOSSES[:] = [0]
+    >>> load_table(path)
+    >>> len(TABLE) > 1000 and is_winning(1000) == (winning_move(1000) > 0)
+    True
+    '''
+
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a Subtract Square table'.format(path))
+        data = f.read()
+    if len(data) > len(TABLE):
+        TABLE[:] = data
+        LOSSES[:] = [p for p in range(len(TABLE)) if not TABLE[p]]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
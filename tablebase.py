@@ -0,0 +1,304 @@
+''' Exact outcome tables for small finite games, found by retrograde
+analysis and kept in files that are memory-mapped to be read.
+
+build_tablebase works with any GameState: it numbers every state
+reachable from a starting state, once each, and resolves their outcomes
+from the end of the game backwards. Each state keeps a count of its moves
+whose outcome is not known yet. A state is a WIN for its next_player as
+soon as one move leads to a LOSE for the opponent, and otherwise, once
+every move is known, the best of them. States left unresolved, which can
+only happen in games that may go on forever, are DRAWs.
+
+A tablebase file is a header (MAGIC, the number of slots and the
+game_tag of its states), then one 64-bit word per slot for the key_hash
+of a state's key, then one byte per slot for the outcome: 0 for an empty
+slot, 1 for LOSE, 2 for DRAW and 3 for WIN, for the next_player of the
+state. Slots form an open addressing hash table at most half full, so a
+Tablebase finds a state in O(1) without reading the whole file, and every
+process that maps the same file shares one copy of it through the page
+cache. Words are in the byte order of the machine that wrote the file.
+Only states with the same game_tag are looked up, so a file built for
+another game, board size or KEY_VERSION is never taken for one that
+applies.
+'''
+import mmap
+import struct
+from array import array
+from collections import deque
+from shared_transposition_table import key_hash
+
+# first bytes of a tablebase file, so that other files are not loaded by
+# mistake
+MAGIC = b'TBASE2\n\0'
+TAG_SIZE = 64
+HEADER = struct.Struct('=8sQ{}s'.format(TAG_SIZE))
+
+# outcome bytes
+EMPTY, LOSE, DRAW, WIN = 0, 1, 2, 3
+
+
+def build_tablebase(state, path):
+    ''' (GameState, str) -> int
+
+    Solve every state reachable from state by retrograde analysis, write
+    their outcomes to a tablebase file at path, and return the number of
+    states. Raise ValueError if two of them have keys with the same
+    key_hash, which would make the file ambiguous.
+
+    >>> import os, tempfile
+    >>> from subtract_square_state import SubtractSquareState
+    >>> path = os.path.join(tempfile.mkdtemp(), 'tablebase')
+    >>> build_tablebase(SubtractSquareState('p1', current_total=20), path)
+    38
+    >>> t = Tablebase(path)
+    >>> t.outcome(SubtractSquareState('p1', current_total=20))
+    -1.0
+    >>> t.outcome(SubtractSquareState('p2', current_total=17))
+    -1.0
+    >>> t.outcome(SubtractSquareState('p1', current_total=17)) is None
+    True
+    >>> from tippy_bitboard_state import TippyBitboardState
+    >>> TippyBitboardState('p1') in t
+    False
+    >>> t.close()
+    '''
+
+    # number the states in the order they are found; edges[starts[i]:
+    # starts[i + 1]] are the numbers of the states the moves of state i
+    # lead to
+    tag, index, found = game_tag(state), {state.key(): 0}, deque([state])
+    starts, edges, results = array('q', [0]), array('q'), bytearray()
+    while found:
+        state = found.popleft()
+        if state.over:
+            results.append(code(state, state.outcome()))
+        else:
+            results.append(EMPTY)
+            for i in state.possible_next_moves():
+                child = state.apply_move(i, True)
+                key = child.key()
+                n = index.get(key)
+                if n is None:
+                    n = index[key] = len(index)
+                    found.append(child)
+                edges.append(n)
+        starts.append(len(edges))
+    size = len(results)
+
+    # invert the edges: parents[pstarts[i]:pstarts[i + 1]] are the numbers
+    # of the states with a move leading to state i
+    pstarts = array('q', bytes(8 * (size + 1)))
+    for n in edges:
+        pstarts[n + 1] += 1
+    for i in range(size):
+        pstarts[i + 1] += pstarts[i]
+    parents, fill = array('q', bytes(8 * len(edges))), pstarts[:-1]
+    for i in range(size):
+        for n in edges[starts[i]:starts[i + 1]]:
+            parents[fill[n]] = i
+            fill[n] += 1
+    del edges, fill
+
+    # resolve states from the end of the game backwards; unknown[i] is the
+    # number of moves of state i whose outcome is not known yet, and
+    # best[i] the best of those that are
+    unknown = array('q', [starts[i + 1] - starts[i] for i in range(size)])
+    best = bytearray([LOSE]) * size
+    resolved = deque([i for i in range(size) if results[i] != EMPTY])
+    while resolved:
+        n = resolved.popleft()
+        # the outcome of state n for the player who moved into it: WIN and
+        # LOSE swap, DRAW stays
+        outcome = 4 - results[n]
+        for i in parents[pstarts[n]:pstarts[n + 1]]:
+            if results[i] != EMPTY:
+                continue
+            if outcome == WIN:
+                results[i] = WIN
+                resolved.append(i)
+            else:
+                best[i] = max(best[i], outcome)
+                unknown[i] -= 1
+                if unknown[i] == 0:
+                    results[i] = best[i]
+                    resolved.append(i)
+    for i in range(size):
+        if results[i] == EMPTY:
+            # neither player can force an end the other cannot avoid
+            results[i] = DRAW
+
+    write_tablebase(path, index, results, tag)
+    return size
+
+
+def game_tag(state):
+    ''' (GameState) -> bytes
+
+    Return what a tablebase records about the kind of state it holds: the
+    module and name of its class, its KEY_VERSION, and the size of its
+    board, which is its size if it has one, or the number of rows of its
+    current_state if that is a list.
+
+    >>> from tippy_bitboard_state import TippyBitboardState
+    >>> game_tag(TippyBitboardState('p1', size=4))
+    b'tippy_bitboard_state.TippyBitboardState 2 4'
+    '''
+
+    size = getattr(state, 'size', None)
+    if size is None and isinstance(getattr(state, 'current_state', None),
+                                   list):
+        size = len(state.current_state)
+    game = type(state)
+    return '{}.{} {} {}'.format(game.__module__, game.__name__,
+                                game.KEY_VERSION, size).encode()
+
+
+def code(state, outcome):
+    ''' (GameState, float) -> int
+
+    Return the outcome byte for outcome, which is state.WIN, state.LOSE or
+    state.DRAW.
+    '''
+
+    if outcome == state.WIN:
+        return WIN
+    elif outcome == state.LOSE:
+        return LOSE
+    else:
+        return DRAW
+
+
+def write_tablebase(path, keys, results, tag):
+    ''' (str, iterable of hashable, bytearray, bytes) -> NoneType
+
+    Write a tablebase file at path, for states whose game_tag is tag,
+    where the state with the n-th of keys has outcome byte results[n].
+    Raise ValueError if tag is too long for the header.
+    '''
+
+    if len(tag) > TAG_SIZE:
+        raise ValueError('game tag {} is too long'.format(tag))
+
+    slots = 2
+    while slots < 2 * len(results):
+        slots *= 2
+    shift, mask = 65 - slots.bit_length(), slots - 1
+    words, outcomes = array('Q', bytes(8 * slots)), bytearray(slots)
+    for (key, outcome) in zip(keys, results):
+        h = key_hash(key)
+        slot = h >> shift
+        while outcomes[slot] != EMPTY:
+            if words[slot] == h:
+                raise ValueError('two states have the key hash {}'.format(h))
+            slot = (slot + 1) & mask
+        words[slot], outcomes[slot] = h, outcome
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, slots, tag))
+        words.tofile(f)
+        f.write(outcomes)
+
+
+class Tablebase:
+    ''' The outcomes of the states in a tablebase file, which is mapped
+    into memory rather than read, so that looking up a state only reads
+    the pages it needs.
+
+    path: str   -- the tablebase file
+    slots: int  -- number of slots in the file
+    tag: bytes  -- game_tag of the states in the file
+    '''
+
+    def __init__(self, path, tag=None):
+        ''' (Tablebase, str, bytes) -> NoneType
+
+        Open the tablebase file at path. Raise ValueError if it is not a
+        tablebase, or if tag is given and is not the game_tag of its
+        states.
+        '''
+
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slots, stored = HEADER.unpack_from(self.map)
+        self.tag = stored.rstrip(b'\0')
+        if magic != MAGIC:
+            self.map.close()
+            raise ValueError('{} is not a tablebase'.format(path))
+        if tag is not None and tag != self.tag:
+            self.map.close()
+            raise ValueError('{} is a tablebase for {}, not {}'.format(
+                path, self.tag, tag))
+        self.shift = 65 - self.slots.bit_length()
+        start = HEADER.size
+        view = memoryview(self.map)
+        self.words = view[start:start + 8 * self.slots].cast('Q')
+        self.outcomes = view[start + 8 * self.slots:]
+        view.release()
+
+    def __reduce__(self):
+        ''' (Tablebase) -> tuple
+
+        Return how to rebuild self in another process: by mapping the same
+        file.
+        '''
+
+        return (Tablebase, (self.path,))
+
+    def lookup(self, key):
+        ''' (Tablebase, hashable) -> int
+
+        Return the outcome byte of the state with key, or EMPTY if it is
+        not in self.
+        '''
+
+        h = key_hash(key)
+        slot, mask = h >> self.shift, self.slots - 1
+        while True:
+            outcome = self.outcomes[slot]
+            if outcome == EMPTY or self.words[slot] == h:
+                return outcome
+            slot = (slot + 1) & mask
+
+    def outcome(self, state):
+        ''' (Tablebase, GameState) -> float
+
+        Return the outcome next_player gets from state with perfect play
+        by both players, or None if state is not in self.
+        '''
+
+        if game_tag(state) != self.tag:
+            return None
+        outcome = self.lookup(state.key())
+        if outcome == WIN:
+            return state.WIN
+        elif outcome == LOSE:
+            return state.LOSE
+        elif outcome == DRAW:
+            return state.DRAW
+        else:
+            return None
+
+    def __contains__(self, state):
+        ''' (Tablebase, GameState) -> bool
+
+        Return whether the outcome of state is in self.
+        '''
+
+        return game_tag(state) == self.tag and \
+            self.lookup(state.key()) != EMPTY
+
+    def close(self):
+        ''' (Tablebase) -> NoneType
+
+        Unmap the file of self.
+        '''
+
+        self.words.release()
+        self.outcomes.release()
+        self.map.close()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,427 @@
+from game_state import GameState
+from tippy_move import TippyMove
+from tippy_game_state import tippy_shapes, tippy_index
+
+
+class TippyBitboardState(GameState):
+    ''' The state of the Tippy game, stored as a pair of bitboards
+
+    Cell (i, j) of the n x n board is bit i * n + j of an integer, so each
+    player's stones fit in a single int and moves, wins and legality checks
+    are a handful of integer operations.
+
+    size: int   --- number of rows (and columns) of the board
+    x: int      --- bitmask of the cells taken by 'p1'
+    o: int      --- bitmask of the cells taken by 'p2'
+    last_move: TippyMove  --- move that produced this state, or None if
+                              unknown
+    '''
+
+    __slots__ = ('size', 'x', 'o', 'last_move')
+
+    PLAYER = {'p1': 'X', 'p2': 'O'}
+
+    # keys tell boards of different sizes apart since version 2
+    KEY_VERSION = 2
+
+    instructions = ('Enter the row number and then the column '
+                    'number of the location where you wish to '
+                    'make your move. The objective is to make '
+                    'a tippy.')
+
+    # tippy bitmasks already computed, keyed by board size
+    MASKS = {}
+
+    # per-cell lists of tippy bitmasks already computed, keyed by board size
+    CELL_MASKS = {}
+
+    def __init__(self, p, interactive=False, size=3, x=0, o=0,
+                 last_move=None):
+        ''' (TippyBitboardState, str, bool, int, int, int, TippyMove)
+            -> NoneType
+
+        Initialize TippyBitboardState self on a size x size board with the
+        stones of 'p1' in bitmask x and the stones of 'p2' in bitmask o.
+        If last_move is given, it is the move just made by the opponent of p,
+        and winner only needs to test the tippies through that cell.
+
+        Assume:   p in {'p1','p2'}
+                  size > 2 so the game can be won
+                  x and o do not share any bits
+                  the state before last_move was not over
+        '''
+
+        if interactive:
+            size = int(input('Enter the size of your grid: '))
+            while size < 3:
+                size = int(input('Size must be at least 3. Try again: '))
+            x, o = 0, 0
+
+        GameState.__init__(self, p)
+        self.size, self.x, self.o = size, x, o
+        self.last_move = last_move
+        self.over = (self.winner('p1') or self.winner('p2') or
+                     (x | o) == (1 << size * size) - 1)
+
+    def __repr__(self):
+        ''' (TippyBitboardState) -> str
+
+        Return a string representation of TippyBitboardState self that
+        evaluates to an equivalent TippyBitboardState.
+
+        >>> t = TippyBitboardState('p1')
+        >>> t
+        TippyBitboardState('p1', size=3, x=0, o=0)
+        '''
+
+        return 'TippyBitboardState({}, size={}, x={}, o={})'.format(
+            repr(self.next_player), self.size, self.x, self.o)
+
+    def __str__(self):
+        ''' (TippyBitboardState) -> str
+
+        Return a convenient string representation of TippyBitboardState self.
+
+        >>> t = TippyBitboardState('p1', x=1, o=16)
+        >>> print(t)
+        Current board:
+        X| | 
+        -----
+         |O| 
+        -----
+         | | 
+        <BLANKLINE>
+        Next to play: p1
+        '''
+
+        rows = ['|'.join(self.current_state[i]) for i in range(self.size)]
+        grid = ('\n' + '-' * (2 * self.size - 1) + '\n').join(rows) + '\n'
+        return 'Current board:\n{}\nNext to play: {}'.format(
+            grid, self.next_player)
+
+    def __eq__(self, other):
+        ''' (TippyBitboardState, TippyBitboardState) -> bool
+
+        Return True iff this TippyBitboardState is the equivalent to other.
+
+        >>> s1 = TippyBitboardState('p1')
+        >>> s2 = TippyBitboardState('p1')
+        >>> s1 == s2
+        True
+        '''
+
+        return (isinstance(other, TippyBitboardState) and
+                self.size == other.size and
+                self.x == other.x and self.o == other.o and
+                self.next_player == other.next_player)
+
+    def __hash__(self):
+        ''' (TippyBitboardState) -> int
+
+        Return a hash value for TippyBitboardState self, consistent with
+        __eq__.
+
+        >>> hash(TippyBitboardState('p1')) == hash(TippyBitboardState('p1'))
+        True
+        '''
+
+        return hash(self.key())
+
+    def key(self):
+        ''' (TippyBitboardState) -> int
+
+        Return both bitboards and the next player packed into one int,
+        under a leading 1 bit whose place gives the size of the board, so
+        that boards of different sizes never share a key. For boards of up
+        to 5 x 5 the key fits in 64 bits.
+
+        >>> TippyBitboardState('p2', x=1, o=2).key()
+        525317
+        >>> a = TippyBitboardState('p2', size=3, x=1 << 7 | 1 << 8, o=1 << 2)
+        >>> a.key() == TippyBitboardState('p2', size=4, x=3, o=4).key()
+        False
+        '''
+
+        cells = self.size * self.size
+        return ((((1 << cells | self.x) << cells) | self.o) << 1 |
+                (self.next_player == 'p2'))
+
+    @property
+    def current_state(self):
+        ''' (TippyBitboardState) -> list
+
+        Return the board as an n x n list of lists of ' ', 'X' and 'O', the
+        representation used by TippyGameState.
+
+        >>> TippyBitboardState('p2', x=1, o=2).current_state[0]
+        ['X', 'O', ' ']
+        '''
+
+        board = []
+        for i in range(self.size):
+            row = []
+            for j in range(self.size):
+                bit = 1 << (i * self.size + j)
+                if self.x & bit:
+                    row.append('X')
+                elif self.o & bit:
+                    row.append('O')
+                else:
+                    row.append(' ')
+            board.append(row)
+        return board
+
+    def apply_move(self, move, trusted=False):
+        ''' (TippyBitboardState, TippyMove, bool) -> TippyBitboardState
+
+        Return the new TippyBitboardState reached by applying move to self,
+        or None if move is illegal. If trusted, skip checking that move is
+        legal.
+
+        >>> s1 = TippyBitboardState('p1')
+        >>> s2 = s1.apply_move(TippyMove([1, 2]))
+        >>> s2
+        TippyBitboardState('p2', size=3, x=2, o=0)
+        >>> s2.apply_move(TippyMove([1, 2])) is None
+        True
+        '''
+
+        i, j = move.pos[0], move.pos[1]
+        if not trusted and (self.over or
+                            not (0 <= i < self.size and 0 <= j < self.size) or
+                            (self.x | self.o) & (1 << (i * self.size + j))):
+            return None
+        bit = 1 << (i * self.size + j)
+        if self.next_player == 'p1':
+            return TippyBitboardState('p2', False, self.size,
+                                      self.x | bit, self.o, move)
+        else:
+            return TippyBitboardState('p1', False, self.size,
+                                      self.x, self.o | bit, move)
+
+    def push(self, move):
+        ''' (TippyBitboardState, TippyMove) -> NoneType
+
+        Apply legal move to self in place.
+
+        >>> s = TippyBitboardState('p1')
+        >>> s.push(TippyMove([1, 2]))
+        >>> s
+        TippyBitboardState('p2', size=3, x=2, o=0)
+        '''
+
+        bit = 1 << (move.pos[0] * self.size + move.pos[1])
+        if self.undo is None:
+            self.undo = []
+        self.undo.append(self.last_move)
+        self.clear_cache()
+        if self.next_player == 'p1':
+            self.x |= bit
+        else:
+            self.o |= bit
+        self.last_move = move
+        self.next_player = self.opponent()
+        self.over = (self.winner(self.opponent()) or
+                     (self.x | self.o) == (1 << self.size * self.size) - 1)
+
+    def pop(self):
+        ''' (TippyBitboardState) -> TippyMove
+
+        Take back the move most recently pushed onto self, and return it.
+
+        >>> s = TippyBitboardState('p1')
+        >>> s.push(TippyMove([1, 2]))
+        >>> s.pop()
+        TippyMove([1, 2])
+        >>> s
+        TippyBitboardState('p1', size=3, x=0, o=0)
+        '''
+
+        move = self.last_move
+        bit = 1 << (move.pos[0] * self.size + move.pos[1])
+        self.clear_cache()
+        self.next_player = self.opponent()
+        if self.next_player == 'p1':
+            self.x ^= bit
+        else:
+            self.o ^= bit
+        self.last_move = self.undo.pop()
+        self.over = False
+        return move
+
+    def get_move(self):
+        ''' (TippyBitboardState) -> TippyMove
+
+        Prompt user and return move.
+        '''
+
+        move = []
+        #first row or column taken as 1, then corrected in TippyMove
+        move.append(int(input('Enter the row (1 to {}): '.format(self.size))))
+        move.append(int(input('Enter the column (1 to {}): '.format(
+            self.size))))
+
+        return TippyMove(move)
+
+    def possible_next_moves(self):
+        ''' (TippyBitboardState) -> list of TippyMove
+
+        Return a (possibly empty) list of moves that are legal from the
+        present state, in row-major order. The list is computed once and
+        then cached, so it must not be modified.
+
+        >>> s1 = TippyBitboardState('p1', x=1)
+        >>> s1.possible_next_moves()[:3]
+        [TippyMove([1, 2]), TippyMove([1, 3]), TippyMove([2, 1])]
+        '''
+
+        if self._moves is None:
+            moves = []
+            if not (self.winner('p1') or self.winner('p2')):
+                free = ~(self.x | self.o) & ((1 << self.size * self.size) - 1)
+                while free:
+                    low = free & -free  # lowest empty cell
+                    cell = low.bit_length() - 1
+                    moves.append(TippyMove([cell // self.size + 1,
+                                            cell % self.size + 1]))
+                    free ^= low
+            self._moves = moves
+        return self._moves
+
+    def winner(self, player):
+        ''' (TippyBitboardState, str) -> bool
+
+        Return True iff a tippy has been formed in self and player has won.
+        The answer for both players is worked out the first time either is
+        asked for, and then cached.
+
+        >>> TippyBitboardState('p2', x=1 + 2 + 16 + 32).winner('p1')
+        True
+        >>> TippyBitboardState('p2', x=1 + 2 + 16).winner('p1')
+        False
+
+        Precondition: player is either 'p1' or 'p2'
+        '''
+
+        if self._winners is None:
+            self._winners = (self.has_tippy('p1'), self.has_tippy('p2'))
+        return self._winners[player == 'p2']
+
+    def has_tippy(self, player):
+        ''' (TippyBitboardState, str) -> bool
+
+        Return True iff player has formed a tippy in self. Helper for
+        TippyBitboardState.winner, which caches its answers.
+
+        Precondition: player is either 'p1' or 'p2'
+        '''
+
+        stones = self.x if player == 'p1' else self.o
+        if self.last_move is not None:
+            #only the player who just moved can have formed a new tippy,
+            #and it has to pass through the cell they just filled
+            if player == self.next_player:
+                return False
+            masks = tippy_cell_masks(self.size)[
+                self.last_move.pos[0] * self.size + self.last_move.pos[1]]
+        else:
+            masks = tippy_masks(self.size)
+        return any(stones & m == m for m in masks)
+
+    def rough_outcome(self):
+        ''' (TippyBitboardState) -> float
+
+        Return an estimate in interval [LOSE,WIN] of best outcome next_player
+        can obtain from state self, comparing the number of empty cells that
+        would complete a tippy for next_player with the number that would
+        complete one for the opponent. If neither has any, return 0.0.
+        The estimate is computed once and then cached.
+
+        This is the same estimate as TippyGameState.rough_outcome.
+
+        >>> TippyBitboardState('p1', x=1 + 2 + 16).rough_outcome()
+        1.0
+        >>> TippyBitboardState('p2', x=1 + 2 + 16).rough_outcome()
+        -1.0
+        '''
+
+        if self._rough is not None:
+            return self._rough
+        if self.winner('p1') or self.winner('p2'):
+            self._rough = 0.0
+            return self._rough
+        free = ~(self.x | self.o) & ((1 << self.size * self.size) - 1)
+        if self.next_player == 'p1':
+            mine, theirs = self.x, self.o
+        else:
+            mine, theirs = self.o, self.x
+        wins = float(len(completing_cells(mine, free, self.size)))
+        losses = float(len(completing_cells(theirs, free, self.size)))
+
+        try:
+            num = 2 * wins / (wins + losses) - 1
+            #scale value into [LOSE, WIN]
+        except ZeroDivisionError:
+            num = 0.0
+
+        self._rough = num
+        return num
+
+
+def tippy_masks(size):
+    ''' (int) -> list of int
+
+    Return the bitmask of every tippy that fits on a size x size board.
+
+    >>> tippy_masks(3)[0] == 1 + 2 + 16 + 32
+    True
+    '''
+
+    if size not in TippyBitboardState.MASKS:
+        TippyBitboardState.MASKS[size] = [
+            sum([1 << (i * size + j) for (i, j) in cells])
+            for cells in tippy_shapes(size)]
+    return TippyBitboardState.MASKS[size]
+
+
+def tippy_cell_masks(size):
+    ''' (int) -> list of list of int
+
+    Return a list whose item i * size + j is the list of bitmasks of the
+    tippies that include cell (i, j) of a size x size board.
+
+    >>> tippy_cell_masks(3)[0] == [1 + 2 + 16 + 32, 1 + 8 + 16 + 128]
+    True
+    '''
+
+    if size not in TippyBitboardState.CELL_MASKS:
+        index = tippy_index(size)
+        TippyBitboardState.CELL_MASKS[size] = [
+            [sum([1 << (i * size + j) for (i, j) in cells])
+             for cells in index[(cell // size, cell % size)]]
+            for cell in range(size * size)]
+    return TippyBitboardState.CELL_MASKS[size]
+
+
+def completing_cells(stones, free, size):
+    ''' (int, int, int) -> set of int
+
+    Return the set of single-cell bitmasks in free which would complete a
+    tippy for the player whose stones are in bitmask stones.
+
+    >>> completing_cells(1 + 2 + 16, ~(1 + 2 + 16) & 511, 3) == {32}
+    True
+    '''
+
+    cells = set()
+    for m in tippy_masks(size):
+        missing = m & ~stones
+        if missing and missing & (missing - 1) == 0 and missing & free:
+            #exactly one cell of the tippy is missing, and it is empty
+            cells.add(missing)
+    return cells
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,7 +1,7 @@
 from game_state import GameState
 from tippy_move import TippyMove
 from math import sqrt
-from random import randint
+from random import randint, Random
 from copy import deepcopy
 
 
@@ -9,19 +9,38 @@ class TippyGameState(GameState):
     ''' The state of the Tippy game
     
     current_state: list   --- n x n array of current board
+    last_move: TippyMove  --- move that produced this state, or None if
+                              unknown
+    zobrist: int          --- Zobrist hash of the board and next player
     '''
     
+    __slots__ = ('current_state', 'last_move', 'zobrist')
+    
     PLAYER = {'p1': 'X', 'p2': 'O'}
     
+    # keys tell boards of different sizes apart since version 2
+    KEY_VERSION = 2
+    
+    instructions = ('Enter the row number and then the column '
+                    'number of the location where you wish to '
+                    'make your move. The objective is to make '
+                    'a tippy.')
+    
     def __init__(self, p, interactive=False,
-                 current_state=[[' ' for i in range(3)] for i in range(3)]):
-        ''' (TippyGameState, str, list) -> Nonetype
+                 current_state=None, last_move=None, zobrist=None):
+        ''' (TippyGameState, str, list, TippyMove, int) -> Nonetype
         
-        Initialize TippyGameState self with current_state as the n x n grid.
+        Initialize TippyGameState self with current_state as the n x n grid,
+        or an empty 3 x 3 grid if current_state is None. If last_move is
+        given, it is the move just made by the opponent of p, and winner
+        only needs to look for tippies through that cell. If zobrist is
+        given, it is the Zobrist hash of the new state, otherwise it is
+        computed from the board.
         
         Assume:   p in {'p1','p2'}
                   current_state is a square list of lists
                   len(current_state) > 2 so the game can be won
+                  the state before last_move was not over
         '''
         
         if interactive:
@@ -29,15 +48,19 @@ class TippyGameState(GameState):
             while size < 3:
                 size = int(input('Size must be at least 3. Try again: '))
             current_state = [[' ' for i in range(size)] for i in range(size)]
+        elif current_state is None:
+            # a fresh grid each time, since push changes the grid in place
+            current_state = [[' ' for i in range(3)] for i in range(3)]
             
         GameState.__init__(self, p)
-        self.current_state = current_state
-        self.over = (self.winner('p1') or self.winner('p2') or not 
-                     self.possible_next_moves())
-        self.instructions = ('Enter the row number and then the column ' 
-                             'number of the location where you wish to '
-                             'make your move. The objective is to make '
-                             'a tippy.')
+        self.current_state, self.last_move = current_state, last_move
+        if zobrist is None:
+            zobrist = board_zobrist(current_state, p)
+        self.zobrist = zobrist
+        # a full board needs no list of moves to recognise, so the move
+        # list is only built if somebody asks for it
+        self.over = (self.winner('p1') or self.winner('p2') or
+                     not any([' ' in row for row in current_state]))
         
     def __repr__(self):
         ''' (TippyGameState) -> str
@@ -101,11 +124,45 @@ class TippyGameState(GameState):
         return (isinstance(other, TippyGameState) and
                 self.current_state == other.current_state and
                 self.next_player == other.next_player)
+
+    def __hash__(self):
+        ''' (TippyGameState) -> int
+
+        Return a hash value for TippyGameState self, consistent with __eq__.
+
+        >>> s1 = TippyGameState('p1')
+        >>> s2 = TippyGameState('p1')
+        >>> hash(s1) == hash(s2)
+        True
+        '''
+
+        return self.zobrist
+
+    def key(self):
+        ''' (TippyGameState) -> int
+
+        Return the Zobrist hash of self, which apply_move keeps up to date
+        without looking at the rest of the board.
+
+        >>> s = TippyGameState('p1')
+        >>> a = s.apply_move(TippyMove([1, 1])).apply_move(TippyMove([2, 2]))
+        >>> a = a.apply_move(TippyMove([3, 3]))
+        >>> b = s.apply_move(TippyMove([3, 3])).apply_move(TippyMove([2, 2]))
+        >>> b = b.apply_move(TippyMove([1, 1]))
+        >>> a.key() == b.key()
+        True
+        >>> a.key() == TippyGameState('p2', False, a.current_state).key()
+        True
+        '''
+
+        return self.zobrist
     
-    def apply_move(self, move):
-        ''' (TippyGameState, TippyMove) -> TippyGameState
+    def apply_move(self, move, trusted=False):
+        ''' (TippyGameState, TippyMove, bool) -> TippyGameState
 
-        Return the new TippyGameState reached by applying move to self.
+        Return the new TippyGameState reached by applying move to self,
+        or None if move is illegal. If trusted, skip checking that move is
+        legal.
         
         >>> s1 = TippyGameState('p1')
         >>> s2 = s1.apply_move(TippyMove([1, 1]))
@@ -120,16 +177,72 @@ class TippyGameState(GameState):
         Next to play: p2
         '''
         
-        if move in self.possible_next_moves():
-            new_state = deepcopy(self.current_state)
+        if trusted or move in self.possible_next_moves():
+            new_state = [row[:] for row in self.current_state]
             if self.next_player == 'p1':
                 new_state[move.pos[0]][move.pos[1]] = 'X'                
             else:
                 new_state[move.pos[0]][move.pos[1]] = 'O'
-            return TippyGameState(self.opponent(), False, new_state)
+            table = zobrist_table(len(new_state))
+            #update the hash with the new stone and the change of player
+            zobrist = (self.zobrist ^ table['side'] ^
+                       table[new_state[move.pos[0]][move.pos[1]]][
+                           move.pos[0]][move.pos[1]])
+            return TippyGameState(self.opponent(), False, new_state, move,
+                                  zobrist)
         else:
             return None
             
+    def push(self, move):
+        ''' (TippyGameState, TippyMove) -> NoneType
+
+        Apply legal move to self in place, updating the grid and the
+        Zobrist hash without copying anything.
+
+        >>> s = TippyGameState('p1')
+        >>> s.push(TippyMove([1, 1]))
+        >>> s == TippyGameState('p1').apply_move(TippyMove([1, 1]))
+        True
+        '''
+
+        i, j = move.pos[0], move.pos[1]
+        if self.undo is None:
+            self.undo = []
+        self.undo.append(self.last_move)
+        self.clear_cache()
+        sym = TippyGameState.PLAYER[self.next_player]
+        table = zobrist_table(len(self.current_state))
+        self.current_state[i][j] = sym
+        self.zobrist ^= table['side'] ^ table[sym][i][j]
+        self.last_move = move
+        self.next_player = self.opponent()
+        self.over = (self.winner(self.opponent()) or
+                     not any([' ' in row for row in self.current_state]))
+
+    def pop(self):
+        ''' (TippyGameState) -> TippyMove
+
+        Take back the move most recently pushed onto self, and return it.
+
+        >>> s = TippyGameState('p1')
+        >>> s.push(TippyMove([1, 1]))
+        >>> s.pop()
+        TippyMove([1, 1])
+        >>> s == TippyGameState('p1') and s.key() == TippyGameState('p1').key()
+        True
+        '''
+
+        move = self.last_move
+        i, j = move.pos[0], move.pos[1]
+        table = zobrist_table(len(self.current_state))
+        self.clear_cache()
+        self.next_player = self.opponent()
+        self.zobrist ^= table['side'] ^ table[self.current_state[i][j]][i][j]
+        self.current_state[i][j] = ' '
+        self.last_move = self.undo.pop()
+        self.over = False
+        return move
+
     def get_move(self):
         ''' (TippyGameState) -> TippyMove
 
@@ -149,7 +262,8 @@ class TippyGameState(GameState):
         ''' (TippyGameState) -> list of TippyMove
 
         Return a (possibly empty) list of moves that are legal from the 
-        present state.
+        present state. The list is computed once and then cached, so it
+        must not be modified.
         
         >>> s1 = TippyGameState('p1')
         >>> s2 = s1.apply_move(TippyMove([1,1]))
@@ -157,29 +271,64 @@ class TippyGameState(GameState):
         [TippyMove([1, 2]), TippyMove([1, 3]), TippyMove([2, 1]), TippyMove([2, 2]), TippyMove([2, 3]), TippyMove([3, 1]), TippyMove([3, 2]), TippyMove([3, 3])]
         '''
         
-        moves = []
-        if not (self.winner('p1') or self.winner('p2')):
-            for i in range(len(self.current_state)):
-                for j in range(len(self.current_state)):
-                    if self.current_state[i][j] == ' ':
-                        moves.append(TippyMove([i + 1, j + 1]))
-                        # the TippyMove representation starts at 1
-        
-        return moves
+        if self._moves is None:
+            moves = []
+            if not (self.winner('p1') or self.winner('p2')):
+                for i in range(len(self.current_state)):
+                    for j in range(len(self.current_state)):
+                        if self.current_state[i][j] == ' ':
+                            moves.append(TippyMove([i + 1, j + 1]))
+                            # the TippyMove representation starts at 1
+            self._moves = moves
+        
+        return self._moves
     
     def winner(self, player):
         ''' (TippyGameState, str) -> bool
         
         Return True iff a tippy has been formed in self and player has won.
+        The answer for both players is worked out the first time either is
+        asked for, and then cached.
         
         >>> s1 = TippyGameState('p1')
         >>> s2 = s1.apply_move(TippyMove([1,1]))
         >>> s2.winner('p1')
         False
+        >>> s3 = TippyGameState('p2', False, [['X', 'X', ' '],
+        ...                                   [' ', 'X', 'X'],
+        ...                                   ['O', 'O', 'O']],
+        ...                     TippyMove([2, 3]))
+        >>> s3.winner('p1'), s3.winner('p2')
+        (True, False)
+        
+        Precondition: player is either 'p1' or 'p2'
+        '''
+        
+        if self._winners is None:
+            self._winners = (self.has_tippy('p1'), self.has_tippy('p2'))
+        return self._winners[player == 'p2']
+    
+    def has_tippy(self, player):
+        ''' (TippyGameState, str) -> bool
+        
+        Return True iff player has formed a tippy in self. Helper for
+        TippyGameState.winner, which caches its answers.
         
         Precondition: player is either 'p1' or 'p2'
         '''
         
+        if self.last_move is not None:
+            #only the player who just moved can have formed a new tippy,
+            #and it has to pass through the cell they just filled
+            if player == self.next_player:
+                return False
+            sym = TippyGameState.PLAYER[player]
+            cell = (self.last_move.pos[0], self.last_move.pos[1])
+            shapes = tippy_index(len(self.current_state))[cell]
+            return any([all([self.current_state[i][j] == sym
+                             for (i, j) in shape])
+                        for shape in shapes])
+        
         win = False
         
         i = 0        
@@ -200,7 +349,8 @@ class TippyGameState(GameState):
         
         Return an estimate in interval [LOSE,WIN] of best outcome next_player
         can obtain from state self, by finding how many moves result in wins
-        and losses. If game is over, return 0.0.
+        and losses. If game is over, return 0.0. The estimate is computed
+        once and then cached.
         
         >>> s1 = TippyGameState('p1')
         >>> s2 = s1.apply_move(TippyMove([1,1]))
@@ -208,14 +358,19 @@ class TippyGameState(GameState):
         0.0
         '''
         
-        new_states = [self.apply_move(i) for i in self.possible_next_moves()]
+        if self._rough is not None:
+            return self._rough
+        
+        new_states = [i for (m, i) in self.children()]
         #run through all options (for next_player) and produce new states
         win_outcome = [i.winner(self.next_player) for i in new_states]
         #determine which of these are winning states (for next_player)
         
-        opp = TippyGameState(self.opponent(), False, self.current_state)
+        opp = TippyGameState(self.opponent(), False, self.current_state, None,
+                             self.zobrist ^ zobrist_table(
+                                 len(self.current_state))['side'])
         #create new state with the opponent next to play
-        new_opp = [opp.apply_move(i) for i in opp.possible_next_moves()]
+        new_opp = [i for (m, i) in opp.children()]
         #run through all options (for opponent) and produce new states
         opp_outcome = [i.winner(opp.next_player) for i in new_opp]
         #determine which of these are losing states (for next_player)
@@ -229,6 +384,7 @@ class TippyGameState(GameState):
         except ZeroDivisionError:
             num = 0.0
         
+        self._rough = num
         return num  
 
 
@@ -257,6 +413,8 @@ def find_tippy(state, sym, pos):
     
     #because we are iterating from the top left to the bottom right,
     #there are only four tippy configurations we need to check
+    #(a negative index would wrap around to the far side of the board,
+    #so the two leftward configurations need y > 0)
     
     if state[x][y] == sym:
         try:  # search for right-rightdown-rightrightdown tippy
@@ -268,9 +426,9 @@ def find_tippy(state, sym, pos):
             pass
         
         try:  # search for right-down-leftdown tippy       
-            if all([state[x][y + 1] == sym,
-                    state[x + 1][y] == sym,
-                    state[x + 1][y - 1] == sym]):
+            if y > 0 and all([state[x][y + 1] == sym,
+                              state[x + 1][y] == sym,
+                              state[x + 1][y - 1] == sym]):
                 tippy = True
         except IndexError:
             pass
@@ -284,15 +442,132 @@ def find_tippy(state, sym, pos):
             pass
         
         try:  # search for down-leftdown-leftdowndown tippy
-            if all([state[x + 1][y] == sym,
-                    state[x + 1][y - 1] == sym,
-                    state[x + 2][y - 1] == sym]):
+            if y > 0 and all([state[x + 1][y] == sym,
+                              state[x + 1][y - 1] == sym,
+                              state[x + 2][y - 1] == sym]):
                 tippy = True
         except IndexError:
             pass
     
     return tippy
 
+
+# tippy shapes already computed, keyed by board size
+SHAPES = {}
+
+
+def tippy_shapes(size):
+    ''' (int) -> list of tuple
+
+    Return a list of every tippy that fits on a size x size board. Each tippy
+    is a tuple of the four (row, column) cells that form it. The list is
+    only computed once for each size.
+
+    >>> len(tippy_shapes(3))
+    8
+    >>> tippy_shapes(3)[0]
+    ((0, 0), (0, 1), (1, 1), (1, 2))
+    '''
+
+    if size not in SHAPES:
+        shapes = []
+        for x in range(size):
+            for y in range(size):
+                #the same four configurations checked by find_tippy
+                for cells in [((x, y), (x, y + 1),
+                               (x + 1, y + 1), (x + 1, y + 2)),
+                              ((x, y), (x, y + 1),
+                               (x + 1, y), (x + 1, y - 1)),
+                              ((x, y), (x + 1, y),
+                               (x + 1, y + 1), (x + 2, y + 1)),
+                              ((x, y), (x + 1, y),
+                               (x + 1, y - 1), (x + 2, y - 1))]:
+                    if all([0 <= i < size and 0 <= j < size
+                            for (i, j) in cells]):
+                        shapes.append(cells)
+        SHAPES[size] = shapes
+    return SHAPES[size]
+
+
+# cell to tippy shape indexes already computed, keyed by board size
+INDEX = {}
+
+
+def tippy_index(size):
+    ''' (int) -> dict of {tuple: list of tuple}
+
+    Return a dict mapping each (row, column) cell of a size x size board to
+    the list of tippy shapes from tippy_shapes(size) that include it. The
+    index is only built once for each size.
+
+    >>> tippy_index(3)[(0, 0)]
+    [((0, 0), (0, 1), (1, 1), (1, 2)), ((0, 0), (1, 0), (1, 1), (2, 1))]
+    >>> max([len(v) for v in tippy_index(6).values()])
+    16
+    '''
+
+    if size not in INDEX:
+        index = {(i, j): [] for i in range(size) for j in range(size)}
+        for shape in tippy_shapes(size):
+            for cell in shape:
+                index[cell].append(shape)
+        INDEX[size] = index
+    return INDEX[size]
+
+# Zobrist tables already generated, keyed by board size
+ZOBRIST = {}
+
+
+def zobrist_table(size):
+    ''' (int) -> dict
+
+    Return the Zobrist table for a size x size board: 'X' and 'O' map to
+    size x size lists of random 64-bit ints, one per cell, 'side' maps
+    to the random int for 'p2' being next to play, and 'board' to the
+    random int the hash of an empty board starts from, so that boards of
+    different sizes do not share hashes. The table is seeded by size, so
+    hashes are the same in every process.
+
+    >>> zobrist_table(3) is zobrist_table(3)
+    True
+    >>> zobrist_table(3)['X'][0][0] == zobrist_table(3)['O'][0][0]
+    False
+    '''
+
+    if size not in ZOBRIST:
+        rand = Random(size)
+        ZOBRIST[size] = {
+            'X': [[rand.getrandbits(64) for j in range(size)]
+                  for i in range(size)],
+            'O': [[rand.getrandbits(64) for j in range(size)]
+                  for i in range(size)],
+            'side': rand.getrandbits(64),
+            'board': rand.getrandbits(64)}
+    return ZOBRIST[size]
+
+
+def board_zobrist(state, p):
+    ''' (list, str) -> int
+
+    Return the Zobrist hash of board state with player p next to play.
+
+    >>> h3 = board_zobrist([[' '] * 3 for i in range(3)], 'p1')
+    >>> h3 == zobrist_table(3)['board']
+    True
+    >>> h3 == board_zobrist([[' '] * 4 for i in range(4)], 'p1')
+    False
+    '''
+
+    table = zobrist_table(len(state))
+    h = table['board']
+    if p == 'p2':
+        h ^= table['side']
+    for i in range(len(state)):
+        for j in range(len(state)):
+            if state[i][j] != ' ':
+                h ^= table[state[i][j]][i][j]
+    return h
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
\ No newline at end of file
@@ -4,19 +4,71 @@ from move import Move
 class TippyMove(Move):
     ''' A move in the game of Tippy.
     
-    pos: list -- list denoting the row and column of the move on the grid.
+    TippyMoves are immutable, and there is only ever one TippyMove for
+    each cell, shared by every board size, so they can be used as dict
+    keys and compared by identity. Positions outside every board, which a
+    user may enter, get a new TippyMove each time, as do cells once MOVES
+    holds MAX_MOVES moves, so that MOVES does not grow without bound.
+    
+    pos: tuple -- tuple denoting the row and column of the move on the grid.
+    MOVES: dict -- the TippyMove for each cell, keyed by the row and column
+                   as the user enters them
+    MAX_MOVES: int -- most moves kept in MOVES
     '''
     
-    def __init__(self, pos):
-        ''' (TippyMove, list) -> NoneType
+    __slots__ = ('pos',)
+    
+    MOVES = {}
+    MAX_MOVES = 2 ** 16
+    
+    def __new__(cls, pos):
+        ''' (type, list) -> TippyMove
     
-        Initialize a new TippyMove for inserting 'X' or 'O' on the grid.
+        Return the TippyMove for inserting 'X' or 'O' on the grid at pos,
+        creating it the first time that cell is asked for if it is on
+        some board.
 
         Assume: pos is a list with integer values 
+        
+        >>> TippyMove([1, 2]) is TippyMove([1, 2])
+        True
+        >>> TippyMove([0, 2]) is TippyMove([0, 2])
+        False
+        '''
+        
+        key = (pos[0], pos[1])
+        move = TippyMove.MOVES.get(key)
+        if move is None:
+            move = Move.__new__(cls)
+            #user will enter number from 1 to n
+            object.__setattr__(move, 'pos', (pos[0] - 1, pos[1] - 1))
+            if pos[0] > 0 and pos[1] > 0 and \
+                    len(TippyMove.MOVES) < TippyMove.MAX_MOVES:
+                TippyMove.MOVES[key] = move
+        return move
+    
+    def __setattr__(self, name, value):
+        ''' (TippyMove, str, object) -> NoneType
+        
+        Refuse to change this TippyMove, since it is shared.
+        
+        >>> TippyMove([1, 1]).pos = (2, 2)
+        Traceback (most recent call last):
+        AttributeError: TippyMove is immutable
         '''
+        raise AttributeError('TippyMove is immutable')
+    
+    def __reduce__(self):
+        ''' (TippyMove) -> tuple
+        
+        Return how to rebuild this TippyMove, so that copying or unpickling
+        it gives back the shared TippyMove for the same cell.
         
-        self.pos = [pos[0] - 1, pos[1] - 1]
-        #user will enter number from 1 to n
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(TippyMove([2, 3]))) is TippyMove([2, 3])
+        True
+        '''
+        return (TippyMove, ([self.pos[0] + 1, self.pos[1] + 1],))
         
     def __repr__(self):
         ''' (TippyMove) -> str
@@ -54,8 +106,18 @@ class TippyMove(Move):
         >>> print(m1 == m3)
         True
         '''
-        return (isinstance(other, TippyMove) and 
-                self.pos == other.pos)
+        return self is other or (isinstance(other, TippyMove) and 
+                                 self.pos == other.pos)
+    
+    def __hash__(self):
+        ''' (TippyMove) -> int
+        
+        Return a hash value for this TippyMove, consistent with __eq__.
+        
+        >>> hash(TippyMove([1, 2])) == hash(TippyMove([1, 2]))
+        True
+        '''
+        return hash(self.pos)
     
 if __name__ == '__main__':
     import doctest
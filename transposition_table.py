@@ -0,0 +1,188 @@
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    ''' A cache of search results for game states, keyed by GameState.key(),
+    that never holds more than a fixed number of entries.
+
+    With policy 'depth', the table is an array of two-entry buckets. The
+    first entry of a bucket keeps whichever result was most expensive to
+    compute (the one with the greatest depth), and the second always takes
+    the newest result, so cheap results near the leaves cannot push out
+    expensive ones near the root. With policy 'lru', the least recently
+    used entry is evicted instead.
+
+    max_entries: int  -- most entries the table will hold
+    policy: str       -- 'depth' or 'lru'
+    hits: int         -- lookups that found their key
+    misses: int       -- lookups that did not
+    stores: int       -- results stored
+    evictions: int    -- entries dropped to make room for another key
+    ENTRY_BYTES: int  -- class constant estimating the memory one entry takes
+    '''
+
+    ENTRY_BYTES = 120
+
+    def __init__(self, max_entries=2**18, max_bytes=None, policy='depth'):
+        ''' (TranspositionTable, int, int, str) -> NoneType
+
+        Create an empty TranspositionTable holding at most max_entries
+        entries, or, if max_bytes is given, about max_bytes of entries.
+
+        Assume: policy is in {'depth', 'lru'}
+        '''
+
+        if max_bytes is not None:
+            max_entries = max_bytes // TranspositionTable.ENTRY_BYTES
+        if policy not in ('depth', 'lru'):
+            raise ValueError('Unknown replacement policy: {}'.format(policy))
+        self.max_entries, self.policy = max(max_entries, 2), policy
+        self.clear()
+
+    def __len__(self):
+        ''' (TranspositionTable) -> int
+
+        Return the number of entries in self.
+
+        >>> t = TranspositionTable(4)
+        >>> t.store('a', 1.0)
+        >>> len(t)
+        1
+        '''
+
+        return self.size
+
+    def clear(self):
+        ''' (TranspositionTable) -> NoneType
+
+        Remove every entry from self and reset the counters.
+        '''
+
+        self.size = self.hits = self.misses = self.stores = 0
+        self.evictions = 0
+        if self.policy == 'lru':
+            self.entries = OrderedDict()
+        else:
+            self.buckets = self.max_entries // 2
+            self.entries = [None] * (2 * self.buckets)
+
+    def probe(self, key):
+        ''' (TranspositionTable, object) -> tuple
+
+        Return the (value, depth) stored for key, or None if there is none.
+
+        >>> t = TranspositionTable(4)
+        >>> t.store('a', 1.0, 3)
+        >>> t.probe('a'), t.probe('b')
+        ((1.0, 3), None)
+        '''
+
+        if self.policy == 'lru':
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        else:
+            i = (hash(key) % self.buckets) * 2
+            entry = self.entries[i]
+            if entry is None or entry[0] != key:
+                entry = self.entries[i + 1]
+                if entry is not None and entry[0] != key:
+                    entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1:]
+
+    def get(self, key):
+        ''' (TranspositionTable, object) -> float
+
+        Return the value stored for key, or None if there is none.
+
+        >>> t = TranspositionTable(4)
+        >>> t.store('a', 1.0)
+        >>> t.get('a'), t.get('b')
+        (1.0, None)
+        '''
+
+        entry = self.probe(key)
+        return None if entry is None else entry[0]
+
+    def store(self, key, value, depth=0):
+        ''' (TranspositionTable, object, float, int) -> NoneType
+
+        Store value for key. depth measures how expensive value was to
+        compute (for example the size of the tree searched below it), and
+        decides which entries the 'depth' policy keeps.
+
+        >>> t = TranspositionTable(2, policy='lru')
+        >>> for k in 'abc':
+        ...     t.store(k, 0.0)
+        >>> t.get('a'), t.get('c'), t.evictions
+        (None, 0.0, 1)
+        >>> t = TranspositionTable(2)
+        >>> t.store('deep', 1.0, 100)
+        >>> t.store('shallow', 0.0, 1)
+        >>> t.store('newest', -1.0, 1)
+        >>> t.get('deep'), t.get('shallow'), t.get('newest')
+        (1.0, None, -1.0)
+        '''
+
+        self.stores += 1
+        entry = (key, value, depth)
+        if self.policy == 'lru':
+            if key not in self.entries:
+                self.size += 1
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            if self.size > self.max_entries:
+                self.entries.popitem(last=False)
+                self.size -= 1
+                self.evictions += 1
+            return
+
+        i = (hash(key) % self.buckets) * 2
+        first, second = self.entries[i], self.entries[i + 1]
+        if second is not None and second[0] == key:
+            # the key moves out of the always-replace entry, if it goes
+            # anywhere else
+            self.entries[i + 1] = second = None
+            self.size -= 1
+        if first is None or first[0] == key or depth >= first[2]:
+            self.entries[i] = entry
+            if first is None:
+                self.size += 1
+            elif first[0] != key:
+                # keep the old entry in the always-replace slot
+                if second is None:
+                    self.size += 1
+                else:
+                    self.evictions += 1
+                self.entries[i + 1] = first
+        else:
+            if second is None:
+                self.size += 1
+            else:
+                self.evictions += 1
+            self.entries[i + 1] = entry
+
+    def stats(self):
+        ''' (TranspositionTable) -> dict
+
+        Return the size of self and its counters.
+
+        >>> t = TranspositionTable(4)
+        >>> t.get('a')
+        >>> t.stats() == {'entries': 0, 'hits': 0, 'misses': 1,
+        ...               'stores': 0, 'evictions': 0}
+        True
+        '''
+
+        return {'entries': self.size, 'hits': self.hits,
+                'misses': self.misses, 'stores': self.stores,
+                'evictions': self.evictions}
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()